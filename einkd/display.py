@@ -2,16 +2,24 @@
 
 import logging
 from abc import ABCMeta, abstractmethod
-from typing import List, Optional, Tuple
+from typing import Iterable, List, Optional, Tuple
 
 from PIL import Image
 
+from .framebuffer import BufferLike, Framebuffer
+
 LOGGER = logging.getLogger(__name__)
 
+# Lookup table mapping unpacked pixel values to a 1-bit image.
+_UNPACKED_LUT = [0] + [255] * 255
+
 
 class Display(metaclass=ABCMeta):
     """An initialised e-ink display that we can control."""
 
+    # The order that the display scans pixels in, either "rows" or "columns".
+    scan_order = "rows"
+
     @property
     @abstractmethod
     def resolution(self) -> Tuple[int, int]:
@@ -47,6 +55,134 @@ class Display(metaclass=ABCMeta):
         """
         raise NotImplementedError  # pragma: nocover
 
+    def show_buffer(
+        self,
+        data: BufferLike,
+        *,
+        channel: Optional[str] = None,
+        packed: bool = False,
+    ) -> None:
+        """
+        Set the image from raw pixel data.
+
+        Unpacked data has one byte per pixel, in rows of shape (height, width).
+        A zero byte is inked, any other value is left blank.
+
+        Packed data is in the native layout of the display, and is sent to the
+        display without being copied. Not all displays support packed data.
+
+        :param data: The pixel data, in any object supporting the buffer protocol.
+        :param channel: The channel to set the data for, default to first.
+        :param packed: The data is in the native packed layout of the display.
+        :raises ValueError: The display does not support packed data.
+        """
+        if packed:
+            raise ValueError(f"{type(self).__name__} does not support packed data.")
+
+        view = self._buffer_view(data, (self.height, self.width))
+        image = Image.frombuffer(
+            "L",
+            self.resolution,
+            view,  # type: ignore
+            "raw",
+            "L",
+            0,
+            1,
+        )
+        self.show(image.point(_UNPACKED_LUT, "1"), channel=channel)
+
+    def show_bands(
+        self,
+        bands: Iterable[Image.Image],
+        *,
+        channel: Optional[str] = None,
+    ) -> None:
+        """
+        Set the image from a sequence of bands, in the scan order of the display.
+
+        If the scan order is rows, each band is a full width strip of rows, from top to
+        bottom. If it is columns, each band is a full height strip of columns, from
+        left to right.
+
+        Displays that support it will encode and send each band as it is produced,
+        so that the whole image is never held in memory. By default, the bands are
+        assembled into an image and shown.
+
+        :param bands: The bands of the image.
+        :param channel: The channel to set the data for, default to first.
+        :raises ValueError: The bands did not match the display size.
+        """
+        image = Image.new("RGB", self.resolution, (255, 255, 255))
+        position = 0
+        for band in bands:
+            if self.scan_order == "columns":
+                image.paste(band, (position, 0))
+                position += band.width
+            else:
+                image.paste(band, (0, position))
+                position += band.height
+
+        if position != (self.width if self.scan_order == "columns" else self.height):
+            raise ValueError("Bands did not match display size.")
+
+        self.show(image, channel=channel)
+
+    def encode(
+        self,
+        buffer: Image.Image,
+        *,
+        channel: Optional[str] = None,
+    ) -> Framebuffer:
+        """
+        Encode an image into pixel data for a channel, ready to be shown.
+
+        Encoding must not communicate with the display, so that the next frame can be
+        encoded whilst the display is busy. By default, the image is packed into a
+        framebuffer in the same orientation.
+
+        :param buffer: The image to encode.
+        :param channel: The channel to encode the image for, default to first.
+        :returns: The encoded pixel data.
+        :raises ValueError: The image did not match the display size.
+        """
+        if buffer.size != self.resolution:
+            raise ValueError(f"Image did not match display size: {buffer.size}")
+        return Framebuffer.from_image(buffer)
+
+    def show_encoded(
+        self,
+        data: Framebuffer,
+        *,
+        channel: Optional[str] = None,
+    ) -> None:
+        """
+        Set the image from pixel data returned by encode.
+
+        :param data: The encoded pixel data.
+        :param channel: The channel to set the data for, default to first.
+        """
+        self.show(data.to_image(), channel=channel)
+
+    @staticmethod
+    def _buffer_view(data: BufferLike, shape: Tuple[int, int]) -> memoryview:
+        """
+        Get a flat byte view of some pixel data, without copying it.
+
+        :param data: The pixel data, in any object supporting the buffer protocol.
+        :param shape: The expected shape of the data, in bytes.
+        :returns: A one dimensional view of the bytes in the data.
+        :raises ValueError: The data did not match the expected layout.
+        """
+        view = memoryview(data)
+        rows, columns = shape
+        if view.itemsize != 1:
+            raise ValueError(f"Expected single byte items, got {view.itemsize} bytes")
+        if not view.c_contiguous:
+            raise ValueError(f"Expected contiguous data, got strides {view.strides}")
+        if view.shape not in (shape, (rows * columns,)):
+            raise ValueError(f"Expected data of shape {shape}, got {view.shape}")
+        return view.cast("B")
+
     @abstractmethod
     def refresh(self) -> None:
         """
@@ -2,13 +2,14 @@
 import logging
 import time
 from math import ceil
-from typing import Optional, List
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
 
 import RPi.GPIO
 import spidev
 from PIL import Image
 
 from einkd.display import Display
+from einkd.framebuffer import Box, BufferLike, Framebuffer
 
 from .base import BaseDriver
 
@@ -20,20 +21,59 @@ CMD_DEEP_SLEEP = 0x07
 CMD_DATA_START_TRANSMISSION = 0x10
 CMD_REFRESH = 0x12
 CMD_DATA_START_TRANSMISSION2 = 0x13
+CMD_LUT_VCOM = 0x20
+CMD_LUT_WW = 0x21
+CMD_LUT_BW = 0x22
+CMD_LUT_WB = 0x23
+CMD_LUT_BB = 0x24
 CMD_VCOM_AND_DATA_INTERVAL_SETTING = 0x50
 CMD_RESOLUTION_SETTING = 0x61
+CMD_PARTIAL_WINDOW = 0x90
+CMD_PARTIAL_IN = 0x91
+CMD_PARTIAL_OUT = 0x92
 
 DATA_BOOSTER_SOFT_START = 0x17  # Always 0x17 from datasheet
 DATA_DEEP_SLEEP_CHECK_CODE = 0xA5  # From datasheet
 
+# Waveform LUTs for the fast profile, which drive black and white only.
+# Each group of 6 bytes is one step of the waveform:
+#   Byte 0    - Voltage level of each of the 4 phases, 2 bits each.
+#               00b = VCOM_DC, 01b = VDH, 10b = VDL, 11b = Floating
+#   Bytes 1-4 - Number of frames in each phase.
+#   Byte 5    - Number of times to repeat the step.
+# Only the first step is used, the remaining steps are all zero.
+LUT_FAST_VCOM = [0x00, 0x19, 0x01, 0x00, 0x00, 0x01] + [0x00] * 38
+LUT_FAST_WW = [0x00, 0x19, 0x01, 0x00, 0x00, 0x01] + [0x00] * 36
+LUT_FAST_BW = [0x80, 0x19, 0x01, 0x00, 0x00, 0x01] + [0x00] * 36
+LUT_FAST_WB = [0x40, 0x19, 0x01, 0x00, 0x00, 0x01] + [0x00] * 36
+LUT_FAST_BB = [0x00, 0x19, 0x01, 0x00, 0x00, 0x01] + [0x00] * 36
+
 LOGGER = logging.getLogger(__name__)
 
 
 class EPD2in13bcDisplay(Display):
-    """An initialised e-ink display that we can control."""
+    """
+    An initialised e-ink display that we can control.
+
+    Images are sent to the display when it is refreshed. If only part of the display
+    has changed, only that part is sent and refreshed, using the partial window of
+    the controller. The changed region is found by comparing the images, unless the
+    caller passes the regions it knows have changed to refresh. After
+    full_refresh_interval partial refreshes, a full refresh is performed to clear
+    any ghosting. A full_refresh_interval of 0 disables partial refreshes.
+
+    The display can be refreshed with one of two profiles. The quality profile uses
+    the factory waveforms, and shows both black and red, but takes several seconds.
+    The fast profile uploads shorter waveforms that only drive black and white, so
+    the red channel is not shown, but takes well under a second. The fast waveforms
+    only drive pixels that change, so the first refresh after setup always uses the
+    quality profile.
+    """
 
     resolution = (212, 104)
     channels = ["black", "red"]
+    profiles = ["quality", "fast"]
+    scan_order = "columns"
 
     def __init__(
         self,
@@ -42,20 +82,43 @@ class EPD2in13bcDisplay(Display):
         dc_pin: int,
         cs_pin: int,
         busy_pin: int,
+        *,
+        full_refresh_interval: int = 10,
+        profile: str = "quality",
     ) -> None:
+        if profile not in self.profiles:
+            raise ValueError(
+                f"Unknown profile: {profile}, expected one of {self.profiles}.",
+            )
+
         self._spi = spi
         self._reset_pin = reset_pin
         self._dc_pin = dc_pin
         self._cs_pin = cs_pin
         self._busy_pin = busy_pin
+        self.full_refresh_interval = full_refresh_interval
+        self.profile = profile
+
+        # The profile that the controller is configured for.
+        self._configured_profile = "quality"
+        # The profile used for the most recent refresh.
+        self.last_profile: Optional[str] = None
 
         self.reset()
         self._init()
 
+        # The images to show on the next refresh.
         self._buffers = {
-            channel: [0xFF] * self.buffer_length
+            channel: Framebuffer(*self.native_resolution)
             for channel in self.channels
         }
+        # The channels that have changed since they were last sent to the display.
+        self._unsent: Set[str] = set(self.channels)
+        # The images currently shown, or None if they are unknown.
+        self._displayed: Optional[Dict[str, Framebuffer]] = None
+        self._partial_refreshes = 0
+        # Streamed data has been sent, or partly sent, so needs a full refresh.
+        self._force_full_refresh = False
 
     def _init(self) -> None:
         """Initialise the display."""
@@ -127,6 +190,59 @@ class EPD2in13bcDisplay(Display):
         self._spi.writebytes([data])  # Send the data.
         RPi.GPIO.output(self._cs_pin, 1)  # De-select the e-ink screen.
 
+    def _configure_profile(self, profile: str) -> None:
+        """
+        Configure the controller to refresh with a profile.
+
+        :param profile: The profile to configure.
+        """
+        LOGGER.debug(f"Configuring {profile} refresh profile")
+        if profile == "fast":
+            # 0xBF = 1011 1111
+            # REG_EN = 1b - LUT from register
+            # BWR    = 1  - Pixel with B / W only
+            # Otherwise the same as the quality profile.
+            self._send_command(CMD_PANEL_SETTING)
+            self._send_data(0xbf)
+
+            # 0x97 = 1001 0111
+            # VBD[1:0] = 10b   - Border is white
+            # DDX[1:0] = 01b   - Default data polarity for B / W mode
+            # CDI[3:0] = 0111b - 10 hsync
+            self._send_command(CMD_VCOM_AND_DATA_INTERVAL_SETTING)
+            self._send_data(0x97)
+
+            luts = [
+                (CMD_LUT_VCOM, LUT_FAST_VCOM),
+                (CMD_LUT_WW, LUT_FAST_WW),
+                (CMD_LUT_BW, LUT_FAST_BW),
+                (CMD_LUT_WB, LUT_FAST_WB),
+                (CMD_LUT_BB, LUT_FAST_BB),
+            ]
+            for command, lut in luts:
+                self._send_command(command)
+                self._send_buffer(bytes(lut))
+        else:
+            # See _init for the meaning of these settings.
+            self._send_command(CMD_PANEL_SETTING)
+            self._send_data(0x8f)
+            self._send_command(CMD_VCOM_AND_DATA_INTERVAL_SETTING)
+            self._send_data(0xf0)
+
+        self._configured_profile = profile
+
+    def _send_buffer(self, data: Union[bytes, memoryview]) -> None:
+        """
+        Send a block of SPI data to the display in a single transfer.
+
+        :param data: The data to send.
+        """
+        LOGGER.debug(f"Sending {len(data)} bytes of data")
+        RPi.GPIO.output(self._dc_pin, 1)  # Set to data mode.
+        RPi.GPIO.output(self._cs_pin, 0)  # Select the e-ink screen.
+        self._spi.writebytes2(data)  # Send the data.
+        RPi.GPIO.output(self._cs_pin, 1)  # De-select the e-ink screen.
+
     def _wait_busy(self) -> None:
         """
         Wait whilst the display is busy.
@@ -147,6 +263,18 @@ class EPD2in13bcDisplay(Display):
         """
         time.sleep(amount_ms / 1000.0)
 
+    @property
+    def native_resolution(self) -> Tuple[int, int]:
+        """
+        The resolution of the display, in the order that the controller scans it.
+
+        The controller scans the display rotated by 90 degrees, so each row of the
+        native layout is a column of the image, starting from the bottom.
+
+        :returns: The resolution of the display as the controller sees it.
+        """
+        return self.height, self.width
+
     @property
     def buffer_length(self) -> int:
         """
@@ -192,12 +320,12 @@ class EPD2in13bcDisplay(Display):
         self._send_command(CMD_DEEP_SLEEP)
         self._send_data(DATA_DEEP_SLEEP_CHECK_CODE)
 
-    def _get_buffer(self, image: Image.Image) -> List[int]:
+    def _get_buffer(self, image: Image.Image) -> Framebuffer:
         """
         Calculate the bytes to send to a display for a given image.
 
         :param image: The image to display.
-        :returns: The list of bytes to send.
+        :returns: A framebuffer in the native layout of the display.
         :raises ValueError: The image did not match the display size.
         """
         LOGGER.debug("Calculating pixel buffer")
@@ -205,19 +333,9 @@ class EPD2in13bcDisplay(Display):
         if image.size != self.resolution:
             raise ValueError(f"Image did not match display size: {image.size}")
 
-        # Fill the buffer with all 1s
-        buffer = [0xff] * self.buffer_length
-        monocolour_image = image.convert("1")
-
-        # Iterate through every pixel in the image.
-        for y in range(self.height):
-            for x in range(self.width):
-                if monocolour_image.getpixel((x, self.height - y - 1)) == 0:
-                    # If the pixel is a 0, flip the bit
-                    byte_pos = (y + x * self.height) // 8
-                    buffer[byte_pos] &= ~(0x80 >> (y % 8))
-
-        return buffer
+        # The controller scans the image rotated, so rotate it to match.
+        monocolour_image = image.convert("1").transpose(Image.Transpose.ROTATE_270)
+        return Framebuffer.from_image(monocolour_image)
 
     def show(
         self,
@@ -231,14 +349,154 @@ class EPD2in13bcDisplay(Display):
         :param buffer: The image to display on the channel.
         :param channel: The channel to set the data for, default to first.
         """
-        if channel not in self.channels:
+        self.show_encoded(self.encode(buffer, channel=channel), channel=channel)
+
+    def show_buffer(
+        self,
+        data: BufferLike,
+        *,
+        channel: Optional[str] = "black",
+        packed: bool = False,
+    ) -> None:
+        """
+        Set the image from raw pixel data.
+
+        Packed data is not copied, so it must not be modified until the display has
+        been refreshed.
+
+        Packed data is in the order that the display scans it, see native_resolution.
+        There is one row of height / 8 bytes for each column of the image, starting
+        from the left. Each row starts at the bottom of the image, with the most
+        significant bit first. A zero bit is inked.
+
+        :param data: The pixel data, in any object supporting the buffer protocol.
+        :param channel: The channel to set the data for, default to first.
+        :param packed: The data is in the native packed layout of the display.
+        """
+        self._check_channel(channel)
+        if not packed:
+            super().show_buffer(data, channel=channel)
+            return
+
+        view = self._buffer_view(data, (self.width, ceil(self.height / 8)))
+        self.show_encoded(Framebuffer(*self.native_resolution, view), channel=channel)
+
+    def show_bands(
+        self,
+        bands: Iterable[Image.Image],
+        *,
+        channel: Optional[str] = "black",
+    ) -> None:
+        """
+        Set the image from a sequence of bands of columns, from left to right.
+
+        Each band is encoded and sent to the display as soon as it is produced, so
+        that the whole image is never held in memory. The next refresh will be a
+        full refresh. If the bands fail part way through, the channel keeps its
+        previous image, which is sent again on the next refresh.
+
+        Each band is dithered separately, so pixels at the edges of bands may differ
+        slightly from the same image passed to show.
+
+        :param bands: The bands of the image.
+        :param channel: The channel to set the data for, default to first.
+        :raises ValueError: The bands did not match the display size.
+        """
+        channel = self._check_channel(channel)
+        buffer = Framebuffer(*self.native_resolution)
+
+        # Until all of the bands have been sent, the display has partial data. If
+        # sending fails, the next refresh will be full and resend the channel.
+        self._unsent.add(channel)
+        self._force_full_refresh = True
+        self._start_transmission(channel)
+
+        position = 0
+        for band in bands:
+            if band.height != self.height or position + band.width > self.width:
+                raise ValueError(f"Band did not match display size: {band.size}")
+
+            # Each column of the image is a row of the native layout.
+            data = band.convert("1").transpose(Image.Transpose.ROTATE_270).tobytes()
+            self._send_buffer(data)
+
+            start = position * buffer.stride
+            buffer.data[start:start + len(data)] = data
+            position += band.width
+
+        if position != self.width:
+            raise ValueError(f"Bands were {position} columns wide, not {self.width}")
+
+        self._buffers[channel] = buffer
+        self._unsent.discard(channel)
+
+    def encode(
+        self,
+        buffer: Image.Image,
+        *,
+        channel: Optional[str] = "black",
+    ) -> Framebuffer:
+        """
+        Encode an image into pixel data for a channel, ready to be shown.
+
+        :param buffer: The image to encode.
+        :param channel: The channel to encode the image for, default to first.
+        :returns: A framebuffer in the native layout of the display.
+        """
+        self._check_channel(channel)
+        return self._get_buffer(buffer)
+
+    def show_encoded(
+        self,
+        data: Framebuffer,
+        *,
+        channel: Optional[str] = "black",
+    ) -> None:
+        """
+        Set the image from pixel data returned by encode.
+
+        :param data: The encoded pixel data.
+        :param channel: The channel to set the data for, default to first.
+        """
+        channel = self._check_channel(channel)
+        if data.size != self.native_resolution:
+            raise ValueError(f"Framebuffer did not match display size: {data.size}")
+        self._buffers[channel] = data
+        self._unsent.add(channel)
+
+    def _check_channel(self, channel: Optional[str]) -> str:
+        """
+        Check that a channel exists on the display.
+
+        :param channel: The channel to check.
+        :returns: The channel.
+        :raises ValueError: The channel does not exist.
+        """
+        if channel is None or channel not in self.channels:
             raise ValueError(
-                "Unknown channel: {channel}, expected one of {self.channels}.",
+                f"Unknown channel: {channel}, expected one of {self.channels}.",
             )
+        return channel
+
+    def _transmit(self, channel: str, data: Union[bytes, memoryview]) -> None:
+        """
+        Transmit the pixel data for a channel to the display.
+
+        :param channel: The channel to send the data for.
+        :param data: The packed pixel data, for the whole display or partial window.
+        """
+        self._start_transmission(channel)
+
+        # Send the pixel data
+        LOGGER.debug("Sending pixel data")
+        self._send_buffer(data)
 
-        data = self._get_buffer(buffer)
+    def _start_transmission(self, channel: str) -> None:
+        """
+        Start the transmission of pixel data for a channel.
 
-        # Start the transmission
+        :param channel: The channel that data will be sent for.
+        """
         if channel == "black":
             LOGGER.debug("Starting transmission of black channel data")
             self._send_command(CMD_DATA_START_TRANSMISSION)
@@ -247,25 +505,204 @@ class EPD2in13bcDisplay(Display):
             self._send_command(CMD_DATA_START_TRANSMISSION2)
         else:
             # This code shouldn't be reachable.
-            raise RuntimeError("Unknown channel: {channel}")
+            raise RuntimeError(f"Unknown channel: {channel}")
 
-        # Send the pixel data
-        LOGGER.debug("Sending pixel data")
-        for pixel_byte in data:
-            self._send_data(pixel_byte, quiet=True)
+    def _changed_region(self, dirty: Optional[Sequence[Box]] = None) -> Optional[Box]:
+        """
+        Get the region of the display that has changed since it was last refreshed.
+
+        :param dirty: The regions of the image that changed, if known. The
+            framebuffers are compared to find the changes if not.
+        :returns: The changed region in the native layout, or None if none changed.
+        """
+        if self._displayed is None:
+            return (0, 0) + self.native_resolution
+
+        if dirty is not None:
+            return self._native_region(dirty)
+
+        boxes = [
+            box for box in (
+                self._buffers[channel].changed(self._displayed[channel])
+                for channel in self._unsent
+            )
+            if box is not None
+        ]
+        if not boxes:
+            return None
+
+        lefts, tops, rights, bottoms = zip(*boxes)
+        return min(lefts), min(tops), max(rights), max(bottoms)
+
+    def _native_region(self, boxes: Sequence[Box]) -> Optional[Box]:
+        """
+        Get the region of the native layout that covers some regions of the image.
 
-    def refresh(self) -> None:
+        :param boxes: The regions of the image.
+        :returns: The region in the native layout, aligned to whole bytes, or None if
+            there are no regions.
+        """
+        if not boxes:
+            return None
+
+        lefts, tops, rights, bottoms = zip(*boxes)
+        # The image is rotated clockwise, so its bottom edge is the native left edge.
+        left = max(self.height - max(bottoms), 0)
+        right = min(self.height - min(tops), self.height)
+        top = max(min(lefts), 0)
+        bottom = min(max(rights), self.width)
+        return (left // 8) * 8, top, min(ceil(right / 8) * 8, self.height), bottom
+
+    def refresh(
+        self,
+        *,
+        full: bool = False,
+        profile: Optional[str] = None,
+        dirty: Optional[Sequence[Box]] = None,
+    ) -> None:
         """
         Refresh the display.
 
         Refreshing the display should update the display to match the buffers.
 
         This function is blocking, and will wait until the display has refreshed.
+
+        :param full: Send and refresh the whole display, even if it hasn't changed.
+        :param profile: The profile to refresh with, defaults to the display profile.
+        :param dirty: The regions of the image that changed since the last refresh,
+            such as Window.dirty. These must cover every change, on every channel.
+            If not given, the changes are found by comparing the images.
+        :raises ValueError: The profile does not exist.
+        """
+        if profile is None:
+            profile = self.profile
+        if profile not in self.profiles:
+            raise ValueError(
+                f"Unknown profile: {profile}, expected one of {self.profiles}.",
+            )
+
+        if profile == "fast" and self._displayed is None:
+            # The fast waveforms don't drive pixels that keep their value, so they
+            # can't be used whilst the image on the glass is unknown.
+            LOGGER.debug("Display contents unknown, refreshing with quality profile.")
+            profile = "quality"
+
+        if profile != self._configured_profile:
+            self._configure_profile(profile)
+            # Each profile uses the data in the controller differently, so resend it.
+            self._unsent.update(self.channels)
+            full = True
+
+        full = full or self._force_full_refresh
+        region = self._changed_region(dirty)
+        if region is None and not full:
+            LOGGER.debug("Display has not changed, skipping refresh.")
+            return
+
+        # Periodically do a full refresh, to clear any ghosting.
+        due_full_refresh = self._partial_refreshes >= self.full_refresh_interval
+        whole_display = (0, 0) + self.native_resolution
+        if region is not None and region != whole_display and not (
+            full or due_full_refresh
+        ):
+            self._refresh_partial(region)
+            self._partial_refreshes += 1
+        else:
+            self._refresh_full()
+            self._partial_refreshes = 0
+
+        self.last_profile = profile
+        self._unsent.clear()
+        self._force_full_refresh = False
+        self._displayed = {
+            channel: buffer.copy()
+            for channel, buffer in self._buffers.items()
+        }
+
+    def _refresh_full(self) -> None:
+        """Send any changed channels, then refresh the whole display."""
+        if self._configured_profile == "fast":
+            self._send_fast_data(None)
+        else:
+            for channel in self.channels:
+                if channel in self._unsent:
+                    self._transmit(channel, self._buffers[channel].data)
+
+        LOGGER.debug("Refreshing display.")
+        self._send_command(CMD_REFRESH)
+        self._wait_busy()
+
+    def _refresh_partial(self, region: Box) -> None:
+        """
+        Send and refresh only a region of the display.
+
+        :param region: The region to refresh, in the native layout.
         """
+        left, top, right, bottom = region
+        LOGGER.debug(f"Refreshing partial window of display: {region}")
+
+        # In partial mode, data transmission and refresh only apply to the window.
+        self._send_command(CMD_PARTIAL_IN)
+
+        # The horizontal start and end are in bytes, so the lower 3 bits are ignored.
+        # HRST[7:3] - Horizontal start channel
+        # HRED[7:3] - Horizontal end channel, inclusive
+        # VRST[8:0] - Vertical start line
+        # VRED[8:0] - Vertical end line, inclusive
+        # PT_SCAN   - 0b, gates only scan inside of the window
+        self._send_command(CMD_PARTIAL_WINDOW)
+        self._send_data(left & 0xf8)
+        self._send_data((right - 1) | 0x07)
+        self._send_data(top >> 8)
+        self._send_data(top & 0xff)
+        self._send_data((bottom - 1) >> 8)
+        self._send_data((bottom - 1) & 0xff)
+        self._send_data(0x00)
+
+        if self._configured_profile == "fast":
+            self._send_fast_data(region)
+        else:
+            # Both channels must be sent, as the window is refreshed from both.
+            for channel in self.channels:
+                self._transmit(channel, self._buffers[channel].region(region))
+
         LOGGER.debug("Refreshing display.")
         self._send_command(CMD_REFRESH)
         self._wait_busy()
 
+        self._send_command(CMD_PARTIAL_OUT)
+
+    def _send_fast_data(self, region: Optional[Box]) -> None:
+        """
+        Send the data for a refresh with the fast profile.
+
+        In black and white mode, the waveform for each pixel depends on its old and
+        new values. The old values are sent in the first transmission, and the new
+        values in the second. The red channel is not shown.
+
+        :param region: The partial window to send, or None for the whole display.
+        """
+        if self._displayed is None:
+            # This code shouldn't be reachable, refresh uses the quality profile.
+            raise RuntimeError("The fast profile needs the displayed image.")
+
+        new = self._buffers["black"]
+        old = self._displayed["black"]
+
+        if self._buffers["red"] != Framebuffer(*self.native_resolution):
+            LOGGER.warning("The red channel is not shown by the fast profile.")
+
+        transmissions: List[Tuple[int, Framebuffer]] = [
+            (CMD_DATA_START_TRANSMISSION, old),
+            (CMD_DATA_START_TRANSMISSION2, new),
+        ]
+        for command, buffer in transmissions:
+            self._send_command(command)
+            if region is None:
+                self._send_buffer(buffer.data)
+            else:
+                self._send_buffer(buffer.region(region))
+
 
 class EPD2in13bcDriver(BaseDriver):
     """Driver for Waveshare 2.13" (B)."""
@@ -280,6 +717,8 @@ class EPD2in13bcDriver(BaseDriver):
         spi_bus: int = 0,
         spi_dev: int = 0,
         spi_max_speed: int = 4000000,
+        full_refresh_interval: int = 10,
+        profile: str = "quality",
     ) -> None:
         self._reset_pin = reset_pin
         self._dc_pin = dc_pin
@@ -288,6 +727,8 @@ class EPD2in13bcDriver(BaseDriver):
         self._spi_bus = spi_bus
         self._spi_dev = spi_dev
         self._spi_max_speed = spi_max_speed
+        self._full_refresh_interval = full_refresh_interval
+        self._profile = profile
 
         self._spi = spidev.SpiDev()
 
@@ -317,6 +758,8 @@ class EPD2in13bcDriver(BaseDriver):
             self._dc_pin,
             self._cs_pin,
             self._busy_pin,
+            full_refresh_interval=self._full_refresh_interval,
+            profile=self._profile,
         )
 
     def cleanup(self) -> None:
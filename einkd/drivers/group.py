@@ -0,0 +1,258 @@
+"""Group of displays that show the same image."""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+from PIL import Image, ImageOps
+
+from einkd.display import Display
+from einkd.framebuffer import Framebuffer
+
+from .base import BaseDriver
+
+LOGGER = logging.getLogger(__name__)
+
+# The type and resolution of a display, which share encoded pixel data.
+DisplayKey = Tuple[Type[Display], Tuple[int, int]]
+
+
+class GroupFramebuffer(Framebuffer):
+    """
+    Pixel data encoded for every display in a group.
+
+    The framebuffer itself holds the data for one of the displays, and encodings
+    holds the data for each distinct type and resolution of display.
+    """
+
+    def __init__(self, encodings: Dict[DisplayKey, Framebuffer]) -> None:
+        first = next(iter(encodings.values()))
+        super().__init__(first.width, first.height, first.data)
+        self.encodings = encodings
+
+
+class DisplayGroup(Display):
+    """
+    A group of displays that show the same image.
+
+    Each display is transmitted to and refreshed on its own thread, so the group
+    takes about as long to update as a single display.
+
+    The group has the resolution of the first display. Images are scaled to fit any
+    display with a different resolution, keeping their aspect ratio and padding the
+    rest of the display with white. Images are encoded once for each distinct type
+    and resolution of display.
+
+    Encoding is done by encode, separately from show_encoded, so the group can be
+    wrapped in a PipelinedDisplay.
+    """
+
+    def __init__(self, displays: Sequence[Display]) -> None:
+        if not displays:
+            raise ValueError("A display group needs at least one display.")
+
+        self._displays = list(displays)
+        self._executor = ThreadPoolExecutor(
+            max_workers=len(self._displays),
+            thread_name_prefix="einkd-group",
+        )
+
+    @property
+    def displays(self) -> List[Display]:
+        """
+        The displays in the group.
+
+        :returns: The list of displays.
+        """
+        return self._displays
+
+    @property
+    def resolution(self) -> Tuple[int, int]:
+        """
+        The resolution of the display.
+
+        :returns: The resolution of the display.
+        """
+        return self._displays[0].resolution
+
+    @property
+    def channels(self) -> List[str]:
+        """
+        The channels available on this display.
+
+        These are the channels available on any display in the group.
+
+        :returns: The list of available channels.
+        """
+        channels: List[str] = []
+        for display in self._displays:
+            channels += [c for c in display.channels if c not in channels]
+        return channels
+
+    def show(
+        self,
+        buffer: Image.Image,
+        *,
+        channel: Optional[str] = None,
+    ) -> None:
+        """
+        Set the image.
+
+        Displays that do not have the channel are left unchanged.
+
+        :param buffer: The image to display on the channel.
+        :param channel: The channel to set the data for, default to first.
+        """
+        self.show_encoded(self.encode(buffer, channel=channel), channel=channel)
+
+    def encode(
+        self,
+        buffer: Image.Image,
+        *,
+        channel: Optional[str] = None,
+    ) -> Framebuffer:
+        """
+        Encode an image into pixel data for a channel, ready to be shown.
+
+        :param buffer: The image to encode.
+        :param channel: The channel to encode the image for, default to first.
+        :returns: The pixel data for each type and resolution of display.
+        """
+        channel = self._check_channel(channel)
+
+        encodings: Dict[DisplayKey, Framebuffer] = {}
+        for display in self._displays:
+            key = (type(display), display.resolution)
+            if channel in display.channels and key not in encodings:
+                image = buffer
+                if image.size != display.resolution:
+                    image = ImageOps.pad(image, display.resolution, color="white")
+                encodings[key] = display.encode(image, channel=channel)
+        return GroupFramebuffer(encodings)
+
+    def show_encoded(
+        self,
+        data: Framebuffer,
+        *,
+        channel: Optional[str] = None,
+    ) -> None:
+        """
+        Set the image from pixel data returned by encode.
+
+        :param data: The encoded pixel data.
+        :param channel: The channel to set the data for, default to first.
+        """
+        channel = self._check_channel(channel)
+        if not isinstance(data, GroupFramebuffer):
+            # Not encoded by the group, so it must be encoded for each display.
+            super().show_encoded(data, channel=channel)
+            return
+
+        encodings = data.encodings
+
+        def show_encoded(display: Display) -> None:
+            encoded = encodings.get((type(display), display.resolution))
+            if encoded is not None:
+                display.show_encoded(encoded, channel=channel)
+
+        self._run_all(show_encoded)
+
+    def _check_channel(self, channel: Optional[str]) -> str:
+        """
+        Check that a channel exists on any display in the group.
+
+        :param channel: The channel to check, or None for the first.
+        :returns: The channel.
+        :raises ValueError: The channel does not exist.
+        """
+        if channel is None:
+            channel = self.channels[0]
+        if channel not in self.channels:
+            raise ValueError(
+                f"Unknown channel: {channel}, expected one of {self.channels}.",
+            )
+        return channel
+
+    def refresh(self) -> None:
+        """
+        Refresh the display.
+
+        Refreshing the display should update the display to match the buffers.
+
+        This function is blocking, and will wait until every display has refreshed.
+        """
+        LOGGER.debug(f"Refreshing {len(self._displays)} displays")
+        self._run_all(lambda display: display.refresh())
+
+    def close(self) -> None:
+        """Stop the threads used to control the displays."""
+        self._executor.shutdown()
+
+    def _run_all(self, func: Callable[[Display], None]) -> None:
+        """
+        Run a function on every display in parallel, and wait for them all to finish.
+
+        :param func: The function to run for each display.
+        """
+        futures = [
+            self._executor.submit(func, display)
+            for display in self._displays
+        ]
+        # Wait for all of the displays before raising any error.
+        errors = [f.exception() for f in futures]
+        for error in errors:
+            if error is not None:
+                raise error
+
+
+class GroupDriver(BaseDriver):
+    """Driver for a group of displays that show the same image."""
+
+    _display: Optional[DisplayGroup] = None
+
+    def __init__(self, drivers: Sequence[BaseDriver]) -> None:
+        self._drivers = list(drivers)
+
+    def setup(self) -> None:
+        """
+        Set up the display.
+
+        After this method has been run, _display should exist.
+
+        This should fail if the display has already been setup.
+
+        If any driver fails to set up, the drivers that were already set up are
+        cleaned up before the error is raised.
+        """
+        displays = []
+        set_up: List[BaseDriver] = []
+        try:
+            for driver in self._drivers:
+                driver.setup()
+                set_up.append(driver)
+                if driver._display is None:
+                    raise RuntimeError("Display is not initialised.")
+                displays.append(driver._display)
+        except Exception:
+            for driver in reversed(set_up):
+                try:
+                    driver.cleanup()
+                except Exception:
+                    LOGGER.exception(f"Failed to clean up {driver}")
+            raise
+
+        self._display = DisplayGroup(displays)
+
+    def cleanup(self) -> None:
+        """
+        Clean up the display.
+
+        After this method has been run, _display should be None.
+        """
+        if self._display is not None:
+            self._display.close()
+
+        for driver in self._drivers:
+            driver.cleanup()
+
+        self._display = None
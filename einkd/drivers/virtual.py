@@ -1,33 +1,125 @@
 """Virtual display."""
+import gc
+import threading
 import tkinter
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 
-from PIL import Image
+from PIL import Image, ImageChops
 from PIL.ImageTk import PhotoImage
 
 from einkd.display import Display
 
 from .base import BaseDriver
 
+# How often the Tk event loop checks for a new frame, in milliseconds.
+POLL_INTERVAL_MS = 10
+
+# How often a blocked refresh checks that the Tk thread is still running, in seconds.
+ALIVE_CHECK_INTERVAL = 0.1
+
+CHANNEL_COLOURS = {
+    "black": (0, 0, 0),
+    "red": (255, 0, 0),
+}
+
 
 class TkinterDisplay(Display):
-    """An initialised e-ink display that we can control."""
+    """
+    An initialised e-ink display that we can control.
+
+    The Tk event loop runs on a dedicated thread, so that the window stays
+    responsive between refreshes. Frames are handed over to it on refresh.
+    """
 
     colour_mode = "RGB"
 
-    channels = ["black"]
+    channels = ["black", "red"]
 
     def __init__(self, resolution: Tuple[int, int]) -> None:
         self._resolution = resolution
 
-        self.window = tkinter.Tk()
-        self.window.wm_title("einkd")
-        self.window.resizable(False, False)
-        self.window.geometry(f"{self.width}x{self.height}")
-        self.frame = tkinter.Frame(self.window)
-        self.frame.pack()
-        self.label = tkinter.Label(self.frame)
-        self.label.pack()
+        self._channel_images: Dict[str, Image.Image] = {
+            channel: Image.new("1", resolution, 255)
+            for channel in self.channels
+        }
+
+        self._lock = threading.Lock()
+        self._pending: Optional[Image.Image] = None
+        self._presented = threading.Event()
+        self._ready = threading.Event()
+        self._closing = False
+        self._error: Optional[Exception] = None
+
+        self._thread = threading.Thread(
+            target=self._run,
+            name="einkd-tkinter",
+            daemon=True,
+        )
+        self._thread.start()
+        self._ready.wait()
+
+        if self._error is not None:
+            raise RuntimeError("Unable to create the display window.") from self._error
+
+    def _run(self) -> None:
+        """
+        Create the window and run the Tk event loop.
+
+        Tk objects must be freed on the thread that created them, so they are only
+        referenced from this thread, and are dropped before it exits.
+        """
+        try:
+            window = tkinter.Tk()
+        except tkinter.TclError as e:
+            self._error = e
+            self._ready.set()
+            return
+
+        window.wm_title("einkd")
+        window.resizable(False, False)
+        window.geometry(f"{self.width}x{self.height}")
+        frame = tkinter.Frame(window)
+        frame.pack()
+        photo_image = PhotoImage("RGB", self.resolution)
+        label = tkinter.Label(frame, image=photo_image)
+        label.pack()
+
+        window.after(POLL_INTERVAL_MS, self._poll, window, photo_image)
+        self._ready.set()
+        try:
+            window.mainloop()
+            try:
+                window.destroy()
+            except tkinter.TclError:
+                # The window was closed by the user, and is already destroyed.
+                pass
+        finally:
+            del label, photo_image, frame, window
+            # Widgets reference each other, so collect them here, not on another thread.
+            gc.collect()
+
+            # Don't leave a refresh waiting on a window that has gone away.
+            self._presented.set()
+
+    def _poll(self, window: tkinter.Tk, photo_image: PhotoImage) -> None:
+        """
+        Present the pending frame, if there is one. Runs on the Tk thread.
+
+        :param window: The Tk window.
+        :param photo_image: The image shown in the window.
+        """
+        with self._lock:
+            frame, self._pending = self._pending, None
+            closing = self._closing
+
+        if frame is not None:
+            photo_image.paste(frame)
+            self._presented.set()
+
+        if closing:
+            window.quit()
+        else:
+            window.after(POLL_INTERVAL_MS, self._poll, window, photo_image)
 
     @property
     def resolution(self) -> Tuple[int, int]:
@@ -42,7 +134,7 @@ class TkinterDisplay(Display):
         self,
         buffer: Image.Image,
         *,
-        channel: Optional[str] = None,
+        channel: Optional[str] = "black",
     ) -> None:
         """
         Set the image.
@@ -50,9 +142,27 @@ class TkinterDisplay(Display):
         :param buffer: The image to display on the channel.
         :param channel: The channel to set the data for, default to first.
         """
-        tkinter_image = PhotoImage(buffer)
-        self.label.imagetk = tkinter_image  # type: ignore
-        self.label.configure(image=tkinter_image)
+        if channel not in self.channels:
+            raise ValueError(
+                f"Unknown channel: {channel}, expected one of {self.channels}.",
+            )
+        if buffer.size != self.resolution:
+            raise ValueError(f"Image did not match display size: {buffer.size}")
+
+        self._channel_images[channel] = buffer.convert("1")
+
+    def _composite(self) -> Image.Image:
+        """
+        Composite the channels into a single image, as the panel would show it.
+
+        :returns: The composited image.
+        """
+        image = Image.new("RGB", self.resolution, (255, 255, 255))
+        for channel in self.channels:
+            # Inked pixels are 0, so invert the channel to get the mask.
+            mask = ImageChops.invert(self._channel_images[channel])
+            image.paste(CHANNEL_COLOURS[channel], mask=mask)
+        return image
 
     def refresh(self) -> None:
         """
@@ -61,9 +171,33 @@ class TkinterDisplay(Display):
         Refreshing the display should update the display to match the buffers.
 
         This function is blocking, and will wait until the display has refreshed.
+
+        :raises RuntimeError: The display window has been closed.
         """
-        self.window.update_idletasks()
-        self.window.update()
+        if not self._thread.is_alive():
+            raise RuntimeError("The display window has been closed.")
+
+        frame = self._composite()
+        with self._lock:
+            self._presented.clear()
+            self._pending = frame
+
+        # The thread may exit before the frame is presented, without setting the
+        # event after it was cleared, so check that it is still running.
+        while not self._presented.wait(ALIVE_CHECK_INTERVAL):
+            if not self._thread.is_alive():
+                break
+
+        with self._lock:
+            presented = self._pending is not frame
+        if not presented:
+            raise RuntimeError("The display window has been closed.")
+
+    def close(self) -> None:
+        """Stop the Tk event loop and close the window."""
+        with self._lock:
+            self._closing = True
+        self._thread.join()
 
 
 class TkinterDriver(BaseDriver):
@@ -91,5 +225,5 @@ class TkinterDriver(BaseDriver):
         After this method has been run, _display should be None.
         """
         if self._display is not None:
-            self._display.window.quit()
+            self._display.close()
             self._display = None
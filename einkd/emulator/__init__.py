@@ -0,0 +1,23 @@
+"""
+Emulation of e-ink display controllers, for testing without hardware.
+
+Stand-ins for the RPi.GPIO and spidev modules are provided, connected to emulated
+controllers. Install them before importing a driver:
+
+    from einkd.emulator import install
+
+    emulator = install()
+    panel = emulator.add_panel()
+
+    from einkd.drivers.epd2in13bc import EPD2in13bcDriver
+"""
+from .emulator import Emulator, install
+from .il0373 import IL0373, ProtocolError, Refresh
+
+__all__ = [
+    "Emulator",
+    "IL0373",
+    "ProtocolError",
+    "Refresh",
+    "install",
+]
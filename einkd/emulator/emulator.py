@@ -0,0 +1,91 @@
+"""An emulated set of e-ink display controllers, connected over GPIO and SPI."""
+
+import sys
+from types import ModuleType
+from typing import Dict, List, Optional, Tuple
+
+from .il0373 import IL0373
+
+_current: Optional["Emulator"] = None
+
+
+class Emulator:
+    """
+    An emulated set of e-ink display controllers, connected over GPIO and SPI.
+
+    Once installed, the emulated RPi.GPIO and spidev modules are connected to the
+    controllers added to the emulator.
+    """
+
+    def __init__(self) -> None:
+        self.panels: Dict[Tuple[int, int], IL0373] = {}
+        self.pin_levels: Dict[int, int] = {}
+        self.pin_modes: Dict[int, int] = {}
+        self.pin_numbering: Optional[int] = None
+
+    def add_panel(
+        self,
+        panel: Optional[IL0373] = None,
+        *,
+        spi_bus: int = 0,
+        spi_dev: int = 0,
+    ) -> IL0373:
+        """
+        Connect a controller to the emulator.
+
+        :param panel: The controller to connect, defaults to an IL0373 with the
+            default pins of the 2.13" (B) driver.
+        :param spi_bus: The SPI bus that the controller is connected to.
+        :param spi_dev: The SPI device that the controller is connected to.
+        :returns: The connected controller.
+        """
+        if panel is None:
+            panel = IL0373()
+        self.panels[(spi_bus, spi_dev)] = panel
+        return panel
+
+    def panels_on_pin(self, pin: int) -> List[IL0373]:
+        """
+        Get the controllers connected to a GPIO pin.
+
+        :param pin: The GPIO pin.
+        :returns: The list of controllers connected to the pin.
+        """
+        return [
+            panel for panel in self.panels.values()
+            if pin in (panel.reset_pin, panel.dc_pin, panel.cs_pin, panel.busy_pin)
+        ]
+
+
+def install(emulator: Optional[Emulator] = None) -> Emulator:
+    """
+    Install the emulated RPi.GPIO and spidev modules.
+
+    This must be called before any driver is imported.
+
+    :param emulator: The emulator to connect the modules to, default to a new one.
+    :returns: The emulator that the modules are connected to.
+    """
+    from . import gpio, spidev
+
+    global _current
+    _current = Emulator() if emulator is None else emulator
+
+    rpi = ModuleType("RPi")
+    rpi.GPIO = gpio  # type: ignore
+    sys.modules["RPi"] = rpi
+    sys.modules["RPi.GPIO"] = gpio
+    sys.modules["spidev"] = spidev
+    return _current
+
+
+def current() -> Emulator:
+    """
+    Get the installed emulator.
+
+    :returns: The installed emulator.
+    :raises RuntimeError: No emulator is installed.
+    """
+    if _current is None:
+        raise RuntimeError("No emulator has been installed.")
+    return _current
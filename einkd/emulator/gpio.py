@@ -0,0 +1,94 @@
+"""Emulated RPi.GPIO module."""
+
+from typing import List, Union
+
+from .emulator import current
+
+BCM = 11
+BOARD = 10
+OUT = 0
+IN = 1
+
+
+def setmode(mode: int) -> None:
+    """
+    Set the pin numbering scheme.
+
+    :param mode: The pin numbering scheme, only BCM is emulated.
+    :raises ValueError: The numbering scheme is not BCM.
+    """
+    if mode != BCM:
+        raise ValueError("Only BCM pin numbering is emulated.")
+    current().pin_numbering = mode
+
+
+def setwarnings(warnings: bool) -> None:
+    """
+    Enable or disable warnings.
+
+    :param warnings: Whether warnings are enabled.
+    """
+
+
+def setup(pin_number: int, mode: int) -> None:
+    """
+    Set up a pin as an input or output.
+
+    :param pin_number: The pin to set up.
+    :param mode: Either IN or OUT.
+    :raises RuntimeError: The pin numbering scheme has not been set.
+    """
+    emulator = current()
+    if emulator.pin_numbering is None:
+        raise RuntimeError("Please set pin numbering mode using GPIO.setmode")
+    emulator.pin_modes[pin_number] = mode
+
+
+def output(pin_number: int, value: Union[int, bool]) -> None:
+    """
+    Set the level of an output pin.
+
+    :param pin_number: The pin to set.
+    :param value: The level to set it to.
+    :raises RuntimeError: The pin has not been set up as an output.
+    """
+    emulator = current()
+    if emulator.pin_modes.get(pin_number) != OUT:
+        raise RuntimeError("The GPIO channel has not been set up as an OUTPUT")
+
+    level = 1 if value else 0
+    emulator.pin_levels[pin_number] = level
+    for panel in emulator.panels_on_pin(pin_number):
+        panel.set_pin(pin_number, level)
+
+
+def input(pin_number: int) -> int:  # noqa: A001
+    """
+    Read the level of a pin.
+
+    :param pin_number: The pin to read.
+    :returns: The level of the pin.
+    :raises RuntimeError: The pin has not been set up.
+    """
+    emulator = current()
+    if pin_number not in emulator.pin_modes:
+        raise RuntimeError("You must setup() the GPIO channel first")
+
+    if emulator.pin_modes[pin_number] == OUT:
+        return emulator.pin_levels.get(pin_number, 0)
+
+    # If several controllers share the pin, any of them can pull it low.
+    panels = emulator.panels_on_pin(pin_number)
+    return min((panel.get_pin(pin_number) for panel in panels), default=0)
+
+
+def cleanup(pins: List[int]) -> None:
+    """
+    Return pins to their default state.
+
+    :param pins: The pins to clean up.
+    """
+    emulator = current()
+    for pin in pins:
+        emulator.pin_modes.pop(pin, None)
+        emulator.pin_levels.pop(pin, None)
@@ -0,0 +1,546 @@
+"""Emulation of the IL0373 e-ink display controller."""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from PIL import Image
+
+from einkd.framebuffer import Box, Framebuffer
+
+LOGGER = logging.getLogger(__name__)
+
+CMD_PANEL_SETTING = 0x00
+CMD_POWER_SETTING = 0x01
+CMD_POWER_OFF = 0x02
+CMD_POWER_ON = 0x04
+CMD_BOOSTER_SOFT_START = 0x06
+CMD_DEEP_SLEEP = 0x07
+CMD_DATA_START_TRANSMISSION = 0x10
+CMD_DATA_STOP = 0x11
+CMD_REFRESH = 0x12
+CMD_DATA_START_TRANSMISSION2 = 0x13
+CMD_LUT_VCOM = 0x20
+CMD_LUT_WW = 0x21
+CMD_LUT_BW = 0x22
+CMD_LUT_WB = 0x23
+CMD_LUT_BB = 0x24
+CMD_PLL_CONTROL = 0x30
+CMD_VCOM_AND_DATA_INTERVAL_SETTING = 0x50
+CMD_RESOLUTION_SETTING = 0x61
+CMD_VCOM_DC_SETTING = 0x82
+CMD_PARTIAL_WINDOW = 0x90
+CMD_PARTIAL_IN = 0x91
+CMD_PARTIAL_OUT = 0x92
+
+DATA_DEEP_SLEEP_CHECK_CODE = 0xA5
+
+# The number of data bytes that each command takes, or None if it varies.
+COMMAND_LENGTHS: Dict[int, Optional[int]] = {
+    CMD_PANEL_SETTING: 1,
+    CMD_POWER_SETTING: 5,
+    CMD_POWER_OFF: 0,
+    CMD_POWER_ON: 0,
+    CMD_BOOSTER_SOFT_START: 3,
+    CMD_DEEP_SLEEP: 1,
+    CMD_DATA_START_TRANSMISSION: None,
+    CMD_DATA_STOP: 0,
+    CMD_REFRESH: 0,
+    CMD_DATA_START_TRANSMISSION2: None,
+    CMD_LUT_VCOM: 44,
+    CMD_LUT_WW: 42,
+    CMD_LUT_BW: 42,
+    CMD_LUT_WB: 42,
+    CMD_LUT_BB: 42,
+    CMD_PLL_CONTROL: 1,
+    CMD_VCOM_AND_DATA_INTERVAL_SETTING: 1,
+    CMD_RESOLUTION_SETTING: 3,
+    CMD_VCOM_DC_SETTING: 1,
+    CMD_PARTIAL_WINDOW: 7,
+    CMD_PARTIAL_IN: 0,
+    CMD_PARTIAL_OUT: 0,
+}
+
+LUT_COMMANDS = [CMD_LUT_VCOM, CMD_LUT_WW, CMD_LUT_BW, CMD_LUT_WB, CMD_LUT_BB]
+
+# The LUT for each transition of a pixel in black and white mode, by (old, new).
+TRANSITION_LUTS = {
+    ("white", "white"): CMD_LUT_WW,
+    ("black", "white"): CMD_LUT_BW,
+    ("white", "black"): CMD_LUT_WB,
+    ("black", "black"): CMD_LUT_BB,
+}
+
+# The colour that each voltage level in a LUT phase drives a pixel towards.
+LEVEL_COLOURS = {
+    0b01: "black",  # VDH
+    0b10: "white",  # VDL
+}
+
+# Bits of the panel setting.
+PANEL_SETTING_REG_EN = 0x20  # 1 = LUT from register, 0 = LUT from OTP
+PANEL_SETTING_BWR = 0x10  # 1 = Black and white, 0 = Black, white and red
+
+
+class ProtocolError(Exception):
+    """The controller was sent something that it would not accept."""
+
+
+@dataclass
+class Refresh:
+    """A refresh of the panel performed by the controller."""
+
+    started: float
+    duration: float
+    window: Box
+    partial: bool
+    register_lut: bool
+    colours: str
+
+
+class IL0373:
+    """
+    An emulated IL0373 controller, and the panel attached to it.
+
+    Commands and data are decoded as the real controller would, and the image on the
+    panel is updated on each refresh. BUSY is held for the configured durations,
+    which can be shortened to speed up tests.
+
+    If strict, protocol errors are raised as ProtocolError from the SPI transfer that
+    caused them. Otherwise they are logged and recorded in errors.
+
+    In black and white mode with LUTs from the registers, each pixel is driven by the
+    LUT for its transition from the first transmission to the second. A pixel only
+    changes if its LUT drives it, so the panel keeps whatever it showed before where
+    the LUT has no driving phases.
+
+    The width and height are in the order that the controller scans them. The images
+    of the panel are rotated by rotate degrees, to match how it is mounted.
+    """
+
+    def __init__(
+        self,
+        *,
+        reset_pin: int = 17,
+        dc_pin: int = 25,
+        cs_pin: int = 8,
+        busy_pin: int = 24,
+        width: int = 104,
+        height: int = 212,
+        rotate: int = 90,
+        refresh_time: float = 15.0,
+        fast_refresh_time: float = 0.3,
+        power_on_time: float = 0.08,
+        power_off_time: float = 0.02,
+        strict: bool = True,
+    ) -> None:
+        if rotate not in (0, 90, 180, 270):
+            raise ValueError(f"Unsupported rotation: {rotate}")
+
+        self.reset_pin = reset_pin
+        self.dc_pin = dc_pin
+        self.cs_pin = cs_pin
+        self.busy_pin = busy_pin
+        self.width = width
+        self.height = height
+        self.rotate = rotate
+        self.refresh_time = refresh_time
+        self.fast_refresh_time = fast_refresh_time
+        self.power_on_time = power_on_time
+        self.power_off_time = power_off_time
+        self.strict = strict
+
+        self.errors: List[str] = []
+        self.refreshes: List[Refresh] = []
+        self.bytes_received = 0
+
+        # The image memory written by each data transmission command.
+        self._ram = {
+            CMD_DATA_START_TRANSMISSION: Framebuffer(width, height),
+            CMD_DATA_START_TRANSMISSION2: Framebuffer(width, height),
+        }
+        self._panel = {
+            "black": Framebuffer(width, height),
+            "red": Framebuffer(width, height),
+        }
+
+        self._dc = 0
+        self._cs = 1
+        self._busy_until = 0.0
+        self._reset_registers()
+
+    def _reset_registers(self) -> None:
+        """Reset the controller to its power on state."""
+        self._asleep = False
+        self._powered = False
+        self._command: Optional[int] = None
+        self._arguments = bytearray()
+        self._position = 0
+        self._panel_setting = 0x0f
+        self._partial = False
+        self._window: Box = (0, 0, self.width, self.height)
+        self._luts: Dict[int, bytes] = {}
+
+    @property
+    def busy(self) -> bool:
+        """
+        Whether the controller is busy.
+
+        :returns: True if the controller is busy.
+        """
+        return time.monotonic() < self._busy_until
+
+    @property
+    def powered(self) -> bool:
+        """
+        Whether the controller has been powered on.
+
+        :returns: True if the booster, regulators and drivers are on.
+        """
+        return self._powered
+
+    @property
+    def asleep(self) -> bool:
+        """
+        Whether the controller is in deep sleep.
+
+        :returns: True if the controller is in deep sleep.
+        """
+        return self._asleep
+
+    @property
+    def images(self) -> Dict[str, Image.Image]:
+        """
+        The images shown on the panel, for each colour.
+
+        :returns: An image in mode "1" for each colour, where 0 is inked.
+        """
+        transpose = {
+            90: Image.Transpose.ROTATE_90,
+            180: Image.Transpose.ROTATE_180,
+            270: Image.Transpose.ROTATE_270,
+        }
+        images = {}
+        for colour, plane in self._panel.items():
+            image = plane.to_image()
+            if self.rotate in transpose:
+                image = image.transpose(transpose[self.rotate])
+            images[colour] = image
+        return images
+
+    def set_pin(self, pin: int, value: int) -> None:
+        """
+        Set the level of an input pin of the controller.
+
+        :param pin: The GPIO pin connected to the controller.
+        :param value: The new level of the pin.
+        """
+        if pin == self.reset_pin:
+            if value == 0:
+                LOGGER.debug("Controller hardware reset")
+                self._reset_registers()
+        if pin == self.dc_pin:
+            self._dc = value
+        if pin == self.cs_pin:
+            self._cs = value
+
+    def get_pin(self, pin: int) -> int:
+        """
+        Get the level of an output pin of the controller.
+
+        :param pin: The GPIO pin connected to the controller.
+        :returns: The level of the pin.
+        """
+        if pin == self.busy_pin:
+            # BUSY_N is low whilst the controller is busy.
+            return 0 if self.busy else 1
+        return 0
+
+    def write(self, data: bytes) -> None:
+        """
+        Receive bytes over SPI.
+
+        :param data: The bytes received.
+        """
+        self.bytes_received += len(data)
+        if self._cs:
+            self._error("Data was sent whilst the controller was not selected.")
+            return
+        if self._asleep:
+            self._error("Data was sent whilst the controller was in deep sleep.")
+            return
+        if self.busy:
+            self._error("Data was sent whilst the controller was busy.")
+            return
+
+        if self._dc:
+            self._receive_data(data)
+        else:
+            for command in data:
+                self._receive_command(command)
+
+    def _error(self, message: str) -> None:
+        """
+        Report a protocol error.
+
+        :param message: A description of the error.
+        :raises ProtocolError: The controller is strict.
+        """
+        if self.strict:
+            raise ProtocolError(message)
+        LOGGER.warning(f"Protocol error: {message}")
+        self.errors.append(message)
+
+    def _receive_command(self, command: int) -> None:
+        """
+        Receive a command.
+
+        :param command: The command.
+        """
+        self._finish_command()
+
+        if command not in COMMAND_LENGTHS:
+            self._error(f"Unknown command: {command:#04x}")
+            return
+
+        self._command = command
+        self._arguments = bytearray()
+        self._position = 0
+        if COMMAND_LENGTHS[command] == 0:
+            self._execute(command, bytes())
+
+    def _receive_data(self, data: bytes) -> None:
+        """
+        Receive data for the current command.
+
+        :param data: The data.
+        """
+        command = self._command
+        if command is None:
+            self._error("Data was sent without a command.")
+            return
+
+        if command in self._ram:
+            self._write_ram(self._ram[command], data)
+            return
+
+        length = COMMAND_LENGTHS[command]
+        if length is None or len(self._arguments) + len(data) > length:
+            self._error(f"Too much data for command {command:#04x}")
+            return
+
+        self._arguments += data
+        if len(self._arguments) == length:
+            self._execute(command, bytes(self._arguments))
+
+    def _finish_command(self) -> None:
+        """Check that the previous command received all of its data."""
+        command = self._command
+        self._command = None
+        if command is None or command in self._ram:
+            return
+
+        length = COMMAND_LENGTHS[command]
+        if length is not None and len(self._arguments) < length:
+            self._error(
+                f"Command {command:#04x} expected {length} bytes of data, "
+                f"got {len(self._arguments)}",
+            )
+
+    def _write_ram(self, plane: Framebuffer, data: bytes) -> None:
+        """
+        Write pixel data into image memory, at the current position in the window.
+
+        :param plane: The image memory to write to.
+        :param data: The pixel data.
+        """
+        left, top, right, bottom = self._window
+        start, end = left // 8, (right + 7) // 8
+        row_length = end - start
+        if self._position + len(data) > row_length * (bottom - top):
+            self._error("Too much pixel data was sent for the window.")
+            return
+
+        for offset in range(0, len(data)):
+            row, column = divmod(self._position + offset, row_length)
+            plane.data[(top + row) * plane.stride + start + column] = data[offset]
+        self._position += len(data)
+
+    def _execute(self, command: int, arguments: bytes) -> None:
+        """
+        Execute a command, once all of its data has been received.
+
+        :param command: The command.
+        :param arguments: The data sent with the command.
+        """
+        if command == CMD_POWER_ON:
+            self._powered = True
+            self._busy_until = time.monotonic() + self.power_on_time
+        elif command == CMD_POWER_OFF:
+            self._powered = False
+            self._busy_until = time.monotonic() + self.power_off_time
+        elif command == CMD_DEEP_SLEEP:
+            if arguments[0] != DATA_DEEP_SLEEP_CHECK_CODE:
+                self._error(f"Incorrect deep sleep check code: {arguments[0]:#04x}")
+            elif self._powered:
+                self._error("Deep sleep was entered whilst powered on.")
+            else:
+                self._asleep = True
+        elif command == CMD_PANEL_SETTING:
+            self._panel_setting = arguments[0]
+        elif command == CMD_RESOLUTION_SETTING:
+            resolution = (arguments[0] & 0xf8, (arguments[1] & 0x01) << 8 | arguments[2])
+            if resolution != (self.width, self.height):
+                self._error(f"Resolution {resolution} does not match the panel.")
+        elif command in LUT_COMMANDS:
+            self._luts[command] = arguments
+        elif command == CMD_PARTIAL_WINDOW:
+            self._window = self._decode_window(arguments)
+        elif command == CMD_PARTIAL_IN:
+            self._partial = True
+        elif command == CMD_PARTIAL_OUT:
+            self._partial = False
+            self._window = (0, 0, self.width, self.height)
+        elif command == CMD_REFRESH:
+            self._refresh()
+
+    def _decode_window(self, arguments: bytes) -> Box:
+        """
+        Decode the arguments of a partial window command.
+
+        :param arguments: The data sent with the command.
+        :returns: The partial window.
+        """
+        left = arguments[0] & 0xf8
+        right = (arguments[1] | 0x07) + 1
+        top = (arguments[2] & 0x01) << 8 | arguments[3]
+        bottom = ((arguments[4] & 0x01) << 8 | arguments[5]) + 1
+        if left >= right or top >= bottom or right > self.width or bottom > self.height:
+            self._error(f"Invalid partial window: {(left, top, right, bottom)}")
+            return 0, 0, self.width, self.height
+        return left, top, right, bottom
+
+    def _refresh(self) -> None:
+        """Refresh the panel from image memory."""
+        if not self._powered:
+            self._error("The display was refreshed whilst powered off.")
+            return
+
+        register_lut = bool(self._panel_setting & PANEL_SETTING_REG_EN)
+        if register_lut and set(self._luts) != set(LUT_COMMANDS):
+            self._error("The display was refreshed before the LUTs were uploaded.")
+            return
+
+        window = self._window if self._partial else (0, 0, self.width, self.height)
+        if self._panel_setting & PANEL_SETTING_BWR:
+            # Black and white mode: the first transmission is the old image.
+            colours = "bw"
+            if register_lut:
+                self._drive_window(window)
+            else:
+                # The OTP waveforms drive every pixel to its new value.
+                new = self._ram[CMD_DATA_START_TRANSMISSION2]
+                self._copy_window(window, new, self._panel["black"])
+                self._copy_window(window, None, self._panel["red"])
+        else:
+            colours = "bwr"
+            sources = {
+                "black": self._ram[CMD_DATA_START_TRANSMISSION],
+                "red": self._ram[CMD_DATA_START_TRANSMISSION2],
+            }
+            for colour, source in sources.items():
+                self._copy_window(window, source, self._panel[colour])
+
+        duration = self.fast_refresh_time if register_lut else self.refresh_time
+        started = time.monotonic()
+        self._busy_until = started + duration
+        self.refreshes.append(Refresh(
+            started=started,
+            duration=duration,
+            window=window,
+            partial=self._partial,
+            register_lut=register_lut,
+            colours=colours,
+        ))
+        LOGGER.debug(f"Refreshing {window} for {duration}s")
+
+    def _drive_window(self, window: Box) -> None:
+        """
+        Drive the pixels in a window with the LUTs for their transitions.
+
+        :param window: The window to drive.
+        """
+        length = len(self._panel["black"])
+        ones = (1 << (length * 8)) - 1
+
+        # Work on whole planes as integers, where a set bit is a white pixel.
+        mask = Framebuffer(self.width, self.height, bytearray(length))
+        self._copy_window(window, None, mask)
+        in_window = int.from_bytes(mask.data, "big")
+        old = int.from_bytes(self._ram[CMD_DATA_START_TRANSMISSION].data, "big")
+        new = int.from_bytes(self._ram[CMD_DATA_START_TRANSMISSION2].data, "big")
+        pixels = {
+            "white": (old, new),
+            "black": (ones ^ old, ones ^ new),
+        }
+
+        driven = {"white": 0, "black": 0}
+        for (old_colour, new_colour), command in TRANSITION_LUTS.items():
+            colour = self._lut_drives(self._luts[command])
+            if colour is not None:
+                transition = pixels[old_colour][0] & pixels[new_colour][1]
+                driven[colour] |= transition & in_window
+
+        black = int.from_bytes(self._panel["black"].data, "big")
+        black = (black | driven["white"]) & (ones ^ driven["black"])
+        red = int.from_bytes(self._panel["red"].data, "big")
+        red |= driven["white"] | driven["black"]
+
+        self._panel["black"].data[:] = black.to_bytes(length, "big")
+        self._panel["red"].data[:] = red.to_bytes(length, "big")
+
+    @staticmethod
+    def _lut_drives(lut: bytes) -> Optional[str]:
+        """
+        Find the colour that a LUT drives a pixel to.
+
+        Each group of 6 bytes selects the level of 4 phases, 2 bits each from the most
+        significant, then the number of frames in each phase, then the number of
+        times the group repeats.
+
+        :param lut: The LUT.
+        :returns: The colour of the last driving phase, or None if nothing is driven.
+        """
+        colour = None
+        for group in range(0, len(lut) - 5, 6):
+            levels, *frames, repeat = lut[group:group + 6]
+            if repeat == 0:
+                continue
+            for phase, count in enumerate(frames):
+                level = (levels >> (6 - 2 * phase)) & 0x03
+                if count and level in LEVEL_COLOURS:
+                    colour = LEVEL_COLOURS[level]
+        return colour
+
+    def _copy_window(
+        self,
+        window: Box,
+        source: Optional[Framebuffer],
+        destination: Framebuffer,
+    ) -> None:
+        """
+        Copy a window of image memory to the panel.
+
+        :param window: The window to copy.
+        :param source: The image memory, or None to clear the window.
+        :param destination: The panel plane.
+        """
+        left, top, right, bottom = window
+        start, end = left // 8, (right + 7) // 8
+        for y in range(top, bottom):
+            row = destination.stride * y
+            if source is None:
+                destination.data[row + start:row + end] = b"\xff" * (end - start)
+            else:
+                destination.data[row + start:row + end] = source.row(y)[start:end]
@@ -0,0 +1,61 @@
+"""Emulated spidev module."""
+
+import time
+from typing import List, Optional, Union
+
+from .emulator import current
+from .il0373 import IL0373
+
+
+class SpiDev:
+    """
+    An emulated SPI device.
+
+    Writes are delayed by the time that they would take at max_speed_hz.
+    """
+
+    def __init__(self) -> None:
+        self.max_speed_hz = 500000
+        self.mode = 0
+        self._panel: Optional[IL0373] = None
+
+    def open(self, bus: int, device: int) -> None:  # noqa: A003
+        """
+        Open an SPI device.
+
+        :param bus: The SPI bus.
+        :param device: The device on the bus.
+        :raises FileNotFoundError: No controller is connected to the device.
+        """
+        panel = current().panels.get((bus, device))
+        if panel is None:
+            raise FileNotFoundError(
+                f"No such file or directory: /dev/spidev{bus}.{device}",
+            )
+        self._panel = panel
+
+    def close(self) -> None:
+        """Close the SPI device."""
+        self._panel = None
+
+    def writebytes(self, data: List[int]) -> None:
+        """
+        Write bytes to the SPI device.
+
+        :param data: The bytes to write.
+        """
+        self.writebytes2(data)
+
+    def writebytes2(self, data: Union[bytes, bytearray, memoryview, List[int]]) -> None:
+        """
+        Write bytes to the SPI device.
+
+        :param data: The bytes to write.
+        :raises RuntimeError: The device is not open.
+        """
+        if self._panel is None:
+            raise RuntimeError("The SPI device is not open.")
+
+        payload = bytes(data)
+        time.sleep(len(payload) * 8 / self.max_speed_hz)
+        self._panel.write(payload)
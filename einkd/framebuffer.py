@@ -0,0 +1,191 @@
+"""A compact, packed framebuffer for a single channel."""
+
+from array import array
+from math import ceil
+from mmap import mmap
+from typing import Optional, Tuple, Union
+
+from PIL import Image
+
+# An object supporting the buffer protocol. SharedMemory.buf is a memoryview, and
+# other objects, e.g. NumPy arrays, can be wrapped in memoryview(...) to pass them.
+BufferLike = Union[bytes, bytearray, memoryview, "array[int]", mmap]
+
+# A rectangle of pixels, as (left, top, right, bottom).
+Box = Tuple[int, int, int, int]
+
+
+class Framebuffer:
+    """
+    A packed, 1-bit plane of pixels.
+
+    Pixels are stored in rows, most significant bit first, with each row padded to a
+    whole number of bytes. A zero bit is inked. This is the same layout as the raw
+    data of a PIL image in mode "1".
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        data: Optional[BufferLike] = None,
+    ) -> None:
+        self._width = width
+        self._height = height
+
+        if data is None:
+            data = bytearray(b"\xff" * (self.stride * height))
+
+        self._data = memoryview(data).cast("B")
+        if len(self._data) != self.stride * height:
+            raise ValueError(
+                f"Expected {self.stride * height} bytes of data, got {len(self._data)}",
+            )
+
+    @classmethod
+    def from_image(cls, image: Image.Image) -> "Framebuffer":
+        """
+        Create a framebuffer from an image.
+
+        :param image: The image to pack into the framebuffer.
+        :returns: A framebuffer containing the image.
+        """
+        width, height = image.size
+        return cls(width, height, image.convert("1").tobytes())
+
+    def copy(self) -> "Framebuffer":
+        """
+        Copy the framebuffer, so that it no longer shares data with its source.
+
+        :returns: A copy of the framebuffer.
+        """
+        return Framebuffer(self._width, self._height, bytearray(self._data))
+
+    def to_image(self) -> Image.Image:
+        """
+        Convert the framebuffer to an image.
+
+        :returns: An image in mode "1".
+        """
+        return Image.frombytes("1", self.size, self._data.tobytes())
+
+    @property
+    def width(self) -> int:
+        """
+        The width of the framebuffer.
+
+        :returns: The width of the framebuffer, in pixels.
+        """
+        return self._width
+
+    @property
+    def height(self) -> int:
+        """
+        The height of the framebuffer.
+
+        :returns: The height of the framebuffer, in pixels.
+        """
+        return self._height
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        """
+        The size of the framebuffer.
+
+        :returns: The width and height of the framebuffer, in pixels.
+        """
+        return self._width, self._height
+
+    @property
+    def stride(self) -> int:
+        """
+        The length of a single row.
+
+        :returns: The length of a row, in bytes.
+        """
+        return ceil(self._width / 8)
+
+    @property
+    def data(self) -> memoryview:
+        """
+        The packed pixel data.
+
+        :returns: A view of the pixel data.
+        """
+        return self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Framebuffer):
+            return NotImplemented
+        return self.size == other.size and self._data == other._data
+
+    def __xor__(self, other: "Framebuffer") -> "Framebuffer":
+        if self.size != other.size:
+            raise ValueError(f"Framebuffer sizes differ: {self.size}, {other.size}")
+
+        # Python integers give a much faster XOR than iterating over the bytes.
+        diff = int.from_bytes(self._data, "big") ^ int.from_bytes(other._data, "big")
+        return Framebuffer(self._width, self._height, diff.to_bytes(len(self), "big"))
+
+    def bbox(self) -> Optional[Box]:
+        """
+        Get the bounding box of the set bits, aligned to whole bytes.
+
+        This is most useful on the XOR of two framebuffers, to find what changed.
+
+        :returns: The bounding box, or None if no bits are set.
+        """
+        top = bottom = None
+        left, right = self.stride, 0
+        for y in range(self._height):
+            row = self.row(y).tobytes()
+            stripped = row.lstrip(b"\x00")
+            if not stripped:
+                continue
+
+            if top is None:
+                top = y
+            bottom = y + 1
+            left = min(left, len(row) - len(stripped))
+            right = max(right, len(row.rstrip(b"\x00")))
+
+        if top is None or bottom is None:
+            return None
+        return left * 8, top, min(right * 8, self._width), bottom
+
+    def changed(self, other: "Framebuffer") -> Optional[Box]:
+        """
+        Get the bounding box of the pixels that differ from another framebuffer.
+
+        :param other: The framebuffer to compare with.
+        :returns: The bounding box aligned to whole bytes, or None if they match.
+        """
+        return (self ^ other).bbox()
+
+    def row(self, y: int) -> memoryview:
+        """
+        Get a view of a single row.
+
+        :param y: The row to get.
+        :returns: A view of the packed pixels in the row.
+        """
+        return self._data[y * self.stride:(y + 1) * self.stride]
+
+    def region(self, box: Box) -> bytes:
+        """
+        Get the packed pixels in a region.
+
+        The left and right edges of the region are rounded out to whole bytes.
+
+        :param box: The region to get.
+        :returns: The packed pixels in the region, row by row.
+        """
+        left, top, right, bottom = box
+        start, end = left // 8, ceil(right / 8)
+        return b"".join(
+            self.row(y)[start:end]
+            for y in range(top, bottom)
+        )
@@ -1,10 +1,11 @@
 """Components in the GUI."""
-from .component import Component
+from .component import Canvas, Component
 from .filled import FilledComponent
 from .image import ImageComponent
 from .text import TextComponent
 
 __all__ = [
+    "Canvas",
     "Component",
     "FilledComponent",
     "ImageComponent",
@@ -1,7 +1,80 @@
 """A component in the GUI."""
 from abc import ABCMeta, abstractmethod
+from dataclasses import dataclass
+from typing import Optional, Tuple, Union
 
-from PIL import Image
+from PIL import Image, ImageDraw
+
+from einkd.framebuffer import Box
+
+# A colour, as accepted by PIL.
+Colour = Union[str, Tuple[int, int, int]]
+
+
+@dataclass(frozen=True)
+class Canvas:
+    """
+    A region of a shared image, that a component draws into.
+
+    Coordinates passed to the canvas are relative to the top left of the region.
+    """
+
+    image: Image.Image
+    box: Box
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        """
+        The size of the region.
+
+        :returns: The width and height of the region, in pixels.
+        """
+        left, top, right, bottom = self.box
+        return right - left, bottom - top
+
+    def offset(self, xy: Tuple[int, int]) -> Tuple[int, int]:
+        """
+        Convert a position in the region to a position in the shared image.
+
+        :param xy: The position in the region.
+        :returns: The position in the shared image.
+        """
+        x, y = xy
+        return self.box[0] + x, self.box[1] + y
+
+    def draw(self) -> ImageDraw.ImageDraw:
+        """
+        Get a drawing context for the shared image.
+
+        Positions must be converted with offset before drawing.
+
+        :returns: A drawing context.
+        """
+        return ImageDraw.Draw(self.image)
+
+    def fill(self, colour: Colour) -> None:
+        """
+        Fill the region with a solid colour.
+
+        :param colour: The colour to fill with.
+        """
+        self.image.paste(colour, self.box)
+
+    def paste(
+        self,
+        image: Image.Image,
+        xy: Tuple[int, int] = (0, 0),
+        *,
+        mask: Optional[Image.Image] = None,
+    ) -> None:
+        """
+        Paste an image into the region.
+
+        :param image: The image to paste.
+        :param xy: The position in the region to paste at.
+        :param mask: An optional mask to paste with.
+        """
+        self.image.paste(image, self.offset(xy), mask=mask)
 
 
 class Component(metaclass=ABCMeta):
@@ -49,3 +122,28 @@ class Component(metaclass=ABCMeta):
         :returns: A rendered component as a PIL image.
         """
         raise NotImplementedError
+
+    def draws_in_place(self, cell_width: int, cell_height: int) -> bool:
+        """
+        Whether render draws directly on the canvas, without calling draw.
+
+        Components that override render to draw in place should also override this.
+
+        :param cell_width: Width of the component in cells.
+        :param cell_height: Heigh of the component in cells.
+        :returns: True if the component draws in place.
+        """
+        return False
+
+    def render(self, canvas: Canvas, cell_width: int, cell_height: int) -> None:
+        """
+        Draw the component in place, on a region of the window.
+
+        Components should override this to avoid allocating an image of their own.
+        By default, the component is drawn and then pasted into the canvas.
+
+        :param canvas: The region of the window to draw in.
+        :param cell_width: Width of the component in cells.
+        :param cell_height: Heigh of the component in cells.
+        """
+        canvas.paste(self.draw(cell_width, cell_height))
@@ -1,7 +1,7 @@
 """A component that fills an area with solid colour."""
 from PIL import Image
 
-from .component import Component
+from .component import Canvas, Component
 
 
 class FilledComponent(Component):
@@ -31,3 +31,23 @@ class FilledComponent(Component):
             (cell_width * self.cell_x, cell_height * self.cell_y),
             self._colour,
         )
+
+    def draws_in_place(self, cell_width: int, cell_height: int) -> bool:
+        """
+        Whether render draws directly on the canvas, without calling draw.
+
+        :param cell_width: Width of the component in cells.
+        :param cell_height: Heigh of the component in cells.
+        :returns: True, as the colour is always filled in place.
+        """
+        return True
+
+    def render(self, canvas: Canvas, cell_width: int, cell_height: int) -> None:
+        """
+        Draw the component in place, on a region of the window.
+
+        :param canvas: The region of the window to draw in.
+        :param cell_width: Width of the component in cells.
+        :param cell_height: Heigh of the component in cells.
+        """
+        canvas.fill(self._colour)
@@ -1,13 +1,32 @@
 """A component that renders an image from a file."""
+import os
 from pathlib import Path
+from typing import BinaryIO, Optional, Tuple, Union
 
 from PIL import Image
 
-from .component import Component
+from .component import Canvas, Component
+
+# An image, or a path or file object to load it from.
+ImageSource = Union[Image.Image, str, Path, BinaryIO]
+
+# The source of a scaled image, its dimensions, and the version of the file if any.
+_CacheKey = Tuple[ImageSource, Tuple[int, int], Optional[Tuple[int, int]]]
 
 
 class ImageComponent(Component):
-    """A component that renders an image from a file."""
+    """
+    A component that renders an image from a file.
+
+    If a path or file object is given, the image is not loaded until it is drawn.
+    It is then decoded at a reduced size where the format allows, so that large
+    images are never fully decoded into memory.
+
+    The scaled image is cached whilst the source is unchanged. A path is reloaded if
+    the modification time or size of the file changes. A file object is only loaded
+    once, so set image to a new file object to show new contents. An image object is
+    never cached, so changes to it are shown when the component is next drawn.
+    """
 
     def __init__(
         self,
@@ -15,12 +34,50 @@ class ImageComponent(Component):
         cell_x: int = 12,
         cell_y: int = 12,
         *,
-        image: Image.Image,
+        image: ImageSource,
         centre: bool = True,
     ) -> None:
         super().__init__(name, cell_x, cell_y)
         self.image = image
         self._centre = centre
+        self._cache: Optional[Tuple[_CacheKey, Image.Image]] = None
+
+    def _load(self, dimensions: Tuple[int, int]) -> Image.Image:
+        """
+        Load the image, scaled to fit within some dimensions.
+
+        Images loaded from a path or file object are cached, so that the source is
+        only loaded again if it changes.
+
+        :param dimensions: The dimensions to fit the image in.
+        :returns: The scaled image.
+        """
+        if isinstance(self.image, Image.Image):
+            # Converting an image is cheap, and it may have been modified in place.
+            image = self.image.convert("RGBA")
+            image.thumbnail(dimensions)
+            return image
+
+        version = None
+        if isinstance(self.image, (str, Path)):
+            stat = os.stat(self.image)
+            version = (stat.st_mtime_ns, stat.st_size)
+
+        if self._cache is not None:
+            (source, cached_dimensions, cached_version), cached_image = self._cache
+            unchanged = source is self.image and cached_version == version
+            if unchanged and cached_dimensions == dimensions:
+                return cached_image
+
+        with Image.open(self.image) as source_image:
+            # Formats that support it, such as JPEG, will decode directly at a
+            # reduced scale that is no smaller than the dimensions.
+            source_image.draft("RGB", dimensions)
+            source_image.thumbnail(dimensions)
+            image = source_image.convert("RGBA")
+
+        self._cache = ((self.image, dimensions, version), image)
+        return image
 
     def draw(self, cell_width: int, cell_height: int) -> Image.Image:
         """
@@ -30,15 +87,43 @@ class ImageComponent(Component):
         :param cell_height: Heigh of the component in cells.
         :returns: A rendered component as a PIL image.
         """
-        image = self.image.convert("RGBA")
         dimensions = (cell_width * self.cell_x, cell_height * self.cell_y)
-        canvas = Image.new(
+        image = Image.new(
             "RGB",
             dimensions,
             (255, 255, 255),
         )
+        self._render_image(Canvas(image, (0, 0) + dimensions))
+        return image
+
+    def draws_in_place(self, cell_width: int, cell_height: int) -> bool:
+        """
+        Whether render draws directly on the canvas, without calling draw.
+
+        :param cell_width: Width of the component in cells.
+        :param cell_height: Heigh of the component in cells.
+        :returns: True, as the scaled image is always pasted in place.
+        """
+        return True
+
+    def render(self, canvas: Canvas, cell_width: int, cell_height: int) -> None:
+        """
+        Draw the component in place, on a region of the window.
 
-        image.thumbnail(dimensions)
+        :param canvas: The region of the window to draw in.
+        :param cell_width: Width of the component in cells.
+        :param cell_height: Heigh of the component in cells.
+        """
+        self._render_image(canvas)
+
+    def _render_image(self, canvas: Canvas) -> None:
+        """
+        Draw the scaled image onto a canvas.
+
+        :param canvas: The region to draw in.
+        """
+        dimensions = canvas.size
+        image = self._load(dimensions)
 
         if self._centre:
             draw_at = (
@@ -48,5 +133,5 @@ class ImageComponent(Component):
         else:
             draw_at = (0, 0)
 
+        canvas.fill((255, 255, 255))
         canvas.paste(image, draw_at, mask=image)
-        return canvas
@@ -1,7 +1,9 @@
 """A component that renders text."""
+from typing import Tuple
+
 from PIL import Image, ImageDraw
 
-from .component import Component
+from .component import Canvas, Component
 
 
 class TextComponent(Component):
@@ -36,3 +38,43 @@ class TextComponent(Component):
         d = ImageDraw.Draw(image)
         d.text((0, 0), self.text, fill="black")
         return image
+
+    def draws_in_place(self, cell_width: int, cell_height: int) -> bool:
+        """
+        Whether render draws directly on the canvas, without calling draw.
+
+        :param cell_width: Width of the component in cells.
+        :param cell_height: Height of the component in cells.
+        :returns: True if the text fits within the component.
+        """
+        d = ImageDraw.Draw(Image.new("1", (1, 1)))
+        return self._fits(d, (cell_width * self.cell_x, cell_height * self.cell_y))
+
+    def _fits(self, d: ImageDraw.ImageDraw, size: Tuple[int, int]) -> bool:
+        """
+        Check whether the text fits within a region.
+
+        :param d: A drawing context, to measure the text with.
+        :param size: The size of the region.
+        :returns: True if the text fits.
+        """
+        _, _, text_right, text_bottom = d.textbbox((0, 0), self.text)
+        width, height = size
+        return text_right <= width and text_bottom <= height
+
+    def render(self, canvas: Canvas, cell_width: int, cell_height: int) -> None:
+        """
+        Draw the component in place, on a region of the window.
+
+        :param canvas: The region of the window to draw in.
+        :param cell_width: Width of the component in cells.
+        :param cell_height: Height of the component in cells.
+        """
+        d = canvas.draw()
+        if not self._fits(d, canvas.size):
+            # Text drawn in place isn't clipped, so draw it separately.
+            super().render(canvas, cell_width, cell_height)
+            return
+
+        canvas.fill(self._background_colour)
+        d.text(canvas.offset((0, 0)), self.text, fill="black")
@@ -1,21 +1,43 @@
 """GUI Window."""
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
-from PIL import Image
+from PIL import Image, ImageChops
 
-from .components import Component
+from einkd.framebuffer import Box
+
+from .components import Canvas, Component
 
 
 @dataclass
 class Window:
-    """GUI Window."""
+    """
+    GUI Window.
+
+    If track_dirty is set, after each draw dirty contains the regions of the window
+    that changed since the previous draw. This keeps a copy of the previous frame, so
+    it is off by default, and dirty is then the whole window.
+    """
 
     width: int
     height: int
     grid_width: int = 12
     grid_height: int = 12
     components: Dict[Tuple[int, int], Component] = field(default_factory=dict)
+    track_dirty: bool = False
+    dirty: List[Box] = field(default_factory=list, init=False, compare=False)
+    _previous: Optional[Image.Image] = field(
+        default=None,
+        init=False,
+        repr=False,
+        compare=False,
+    )
+    _previous_boxes: List[Box] = field(
+        default_factory=list,
+        init=False,
+        repr=False,
+        compare=False,
+    )
 
     @property
     def cell_width(self) -> int:
@@ -73,15 +95,134 @@ class Window:
         """
         self.validate_components()
         image = Image.new("RGB", (self.width, self.height), (255, 255, 255))
+        boxes = []
+        for box, comp in self._component_boxes():
+            comp.render(Canvas(image, box), self.cell_width, self.cell_height)
+            boxes.append(box)
+
+        if self.track_dirty:
+            self.dirty = self._find_dirty(image, boxes)
+            self._previous = image.copy()
+            self._previous_boxes = boxes
+        else:
+            self.dirty = [(0, 0, self.width, self.height)]
+            self._previous = None
+        return image
+
+    def draw_bands(
+        self,
+        band_size: int,
+        *,
+        scan_order: str = "rows",
+    ) -> Iterator[Image.Image]:
+        """
+        Render the window in bands, so that the whole image is never held in memory.
+
+        Each band is only drawn when it is needed. Components that draw in place are
+        drawn into each band that they overlap. Other components are drawn once, and
+        held in memory until the last band that they overlap. Dirty regions are not
+        tracked.
+
+        :param band_size: The number of rows or columns in each band.
+        :param scan_order: Either "rows" for bands of rows from top to bottom, or
+            "columns" for bands of columns from left to right.
+        :returns: An iterator of rendered bands.
+        :raises ValueError: The scan order is not known.
+        """
+        if scan_order not in ("rows", "columns"):
+            raise ValueError(f"Unknown scan order: {scan_order}")
+
+        self.validate_components()
+        boxes = self._component_boxes()
+        in_place = {
+            comp.name: comp.draws_in_place(self.cell_width, self.cell_height)
+            for _, comp in boxes
+        }
+        drawn: Dict[str, Image.Image] = {}
+        columns = scan_order == "columns"
+        length = self.width if columns else self.height
+        for start in range(0, length, band_size):
+            end = min(start + band_size, length)
+            if columns:
+                band_box = (start, 0, end, self.height)
+            else:
+                band_box = (0, start, self.width, end)
+
+            band_left, band_top, band_right, band_bottom = band_box
+            band = Image.new(
+                "RGB",
+                (band_right - band_left, band_bottom - band_top),
+                (255, 255, 255),
+            )
+            for (left, top, right, bottom), comp in boxes:
+                overlaps_band = left < band_right and right > band_left and (
+                    top < band_bottom and bottom > band_top
+                )
+                if overlaps_band:
+                    canvas = Canvas(band, (
+                        left - band_left,
+                        top - band_top,
+                        right - band_left,
+                        bottom - band_top,
+                    ))
+                    if in_place[comp.name]:
+                        comp.render(canvas, self.cell_width, self.cell_height)
+                    else:
+                        if comp.name not in drawn:
+                            drawn[comp.name] = comp.draw(
+                                self.cell_width,
+                                self.cell_height,
+                            )
+                        canvas.paste(drawn[comp.name])
+
+                        # Release the drawn component after the last band it is in.
+                        if (right if columns else bottom) <= end:
+                            del drawn[comp.name]
+            yield band
+
+    def _component_boxes(self) -> List[Tuple[Box, Component]]:
+        """
+        Get the region of the window that each component is drawn in.
+
+        :returns: A list of regions and the component drawn in them.
+        """
         x_offset = (self.width % self.cell_width) // 2
         y_offset = (self.height % self.cell_height) // 2
+        boxes = []
         for (x, y), comp in self.components.items():
-            sub_image = comp.draw(self.cell_width, self.cell_height)
-            image.paste(
-                sub_image,
-                (
-                    x_offset + x * self.cell_width,
-                    y_offset + y * self.cell_height,
-                ),
+            left = x_offset + x * self.cell_width
+            top = y_offset + y * self.cell_height
+            box = (
+                left,
+                top,
+                left + comp.cell_x * self.cell_width,
+                top + comp.cell_y * self.cell_height,
             )
-        return image
+            boxes.append((box, comp))
+        return boxes
+
+    def _find_dirty(self, image: Image.Image, boxes: List[Box]) -> List[Box]:
+        """
+        Find the regions of the window that have changed since the previous draw.
+
+        :param image: The newly drawn window.
+        :param boxes: The regions that components were drawn in.
+        :returns: The bounding box of the changes in each component.
+        """
+        if self._previous is None or self._previous_boxes != boxes:
+            # The layout has changed, so assume that everything has.
+            return [(0, 0, self.width, self.height)]
+
+        dirty = []
+        for box in boxes:
+            diff = ImageChops.difference(self._previous.crop(box), image.crop(box))
+            changed = diff.getbbox()
+            if changed is not None:
+                left, top, right, bottom = changed
+                dirty.append((
+                    box[0] + left,
+                    box[1] + top,
+                    box[0] + right,
+                    box[1] + bottom,
+                ))
+        return dirty
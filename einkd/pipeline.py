@@ -0,0 +1,211 @@
+"""A display that prepares the next frame whilst the current one refreshes."""
+
+import logging
+import queue
+import threading
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+from PIL import Image
+
+from .display import Display
+from .framebuffer import Framebuffer
+
+LOGGER = logging.getLogger(__name__)
+
+# A function that renders a frame, as an image for each channel.
+RenderFunction = Callable[[], Mapping[str, Image.Image]]
+
+
+class PipelinedDisplay(Display):
+    """
+    A display that prepares the next frame whilst the current one refreshes.
+
+    Frames are rendered and encoded on one worker thread, then transmitted and
+    refreshed on another, with queues of at most depth frames between them. The
+    next frame is therefore ready to transmit as soon as the display is no longer
+    busy.
+
+    Unlike other displays, refresh returns as soon as the frame has been queued. Use
+    wait to block until all queued frames have been shown.
+
+    The wrapped display must not be used directly whilst it is pipelined.
+    """
+
+    def __init__(self, display: Display, *, depth: int = 1) -> None:
+        self._display = display
+
+        self._lock = threading.Lock()
+        self._staged: Dict[str, Image.Image] = {}
+        self._error: Optional[BaseException] = None
+
+        # Held whilst queueing, so that nothing is queued after the pipeline closes.
+        self._submit_lock = threading.Lock()
+        self._closed = False
+
+        self._render_queue: "queue.Queue[Optional[RenderFunction]]" = queue.Queue(
+            maxsize=depth,
+        )
+        self._commit_queue: "queue.Queue[Optional[Dict[str, Framebuffer]]]" = queue.Queue(
+            maxsize=depth,
+        )
+
+        self._threads = [
+            threading.Thread(target=target, name=name, daemon=True)
+            for target, name in [
+                (self._render_worker, "einkd-render"),
+                (self._commit_worker, "einkd-commit"),
+            ]
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def resolution(self) -> Tuple[int, int]:
+        """
+        The resolution of the display.
+
+        :returns: The resolution of the display.
+        """
+        return self._display.resolution
+
+    @property
+    def channels(self) -> List[str]:
+        """
+        The channels available on this display.
+
+        :returns: The list of available channels.
+        """
+        return self._display.channels
+
+    def show(
+        self,
+        buffer: Image.Image,
+        *,
+        channel: Optional[str] = None,
+    ) -> None:
+        """
+        Set the image for the next frame.
+
+        The image is not copied, so it must not be modified until it has been shown.
+
+        :param buffer: The image to display on the channel.
+        :param channel: The channel to set the data for, default to first.
+        """
+        if channel is None:
+            channel = self.channels[0]
+        if channel not in self.channels:
+            raise ValueError(
+                f"Unknown channel: {channel}, expected one of {self.channels}.",
+            )
+
+        with self._lock:
+            self._staged[channel] = buffer
+
+    def refresh(self) -> None:
+        """
+        Queue the images set since the last refresh to be shown as a frame.
+
+        This function only blocks whilst the pipeline is full.
+
+        :raises RuntimeError: The pipeline has been closed.
+        """
+        with self._lock:
+            frame, self._staged = self._staged, {}
+        self.submit(lambda: frame)
+
+    def submit(self, render: RenderFunction) -> None:
+        """
+        Queue a frame to be rendered and shown.
+
+        The render function is called on a worker thread, and should return an image
+        for each channel to be updated.
+
+        This function only blocks whilst the pipeline is full.
+
+        :param render: A function that renders the frame.
+        :raises RuntimeError: The pipeline has been closed.
+        """
+        self._check_error()
+        with self._submit_lock:
+            if self._closed:
+                raise RuntimeError("The display pipeline has been closed.")
+            self._render_queue.put(render)
+
+    def wait(self) -> None:
+        """Wait until all queued frames have been shown."""
+        self._render_queue.join()
+        self._commit_queue.join()
+        self._check_error()
+
+    def close(self) -> None:
+        """
+        Show all queued frames and stop the workers.
+
+        Calling this more than once has no further effect.
+        """
+        with self._submit_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._render_queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._check_error()
+
+    def _check_error(self) -> None:
+        """
+        Raise any error that has occurred on a worker thread.
+
+        :raises RuntimeError: A frame failed to render or be shown.
+        """
+        with self._lock:
+            error, self._error = self._error, None
+
+        if error is not None:
+            raise RuntimeError("Failed to show a frame.") from error
+
+    def _set_error(self, error: BaseException) -> None:
+        """
+        Store an error to be raised on the next call to the pipeline.
+
+        :param error: The error that occurred.
+        """
+        LOGGER.exception("Error in display pipeline")
+        with self._lock:
+            self._error = error
+
+    def _render_worker(self) -> None:
+        """Render and encode frames until the pipeline is closed."""
+        while True:
+            render = self._render_queue.get()
+            try:
+                if render is None:
+                    self._commit_queue.put(None)
+                    return
+
+                frame = {
+                    channel: self._display.encode(image, channel=channel)
+                    for channel, image in render().items()
+                }
+                self._commit_queue.put(frame)
+            except Exception as e:
+                self._set_error(e)
+            finally:
+                self._render_queue.task_done()
+
+    def _commit_worker(self) -> None:
+        """Transmit and refresh frames until the pipeline is closed."""
+        while True:
+            frame = self._commit_queue.get()
+            try:
+                if frame is None:
+                    return
+
+                LOGGER.debug("Committing frame")
+                for channel, data in frame.items():
+                    self._display.show_encoded(data, channel=channel)
+                self._display.refresh()
+            except Exception as e:
+                self._set_error(e)
+            finally:
+                self._commit_queue.task_done()
@@ -0,0 +1,177 @@
+"""Show a sequence of images on a display, preparing each one in advance."""
+
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import cycle
+from typing import Deque, Dict, Iterator, Optional, Sequence, Tuple, Union
+
+from PIL import Image
+
+from .display import Display
+from .framebuffer import Framebuffer
+from .gui import Window
+from .gui.components import ImageComponent
+from .gui.components.image import ImageSource
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class PlaylistItem:
+    """
+    An item in a playlist.
+
+    The source is either an image, a path or file object to load one from, or a
+    window to draw. Images are scaled to fit the display. The item is shown on the
+    channel, and all other channels are cleared.
+    """
+
+    source: Union[ImageSource, Window]
+    dwell: float = 5.0
+    channel: Optional[str] = None
+
+
+class Playlist:
+    """
+    Show a sequence of items on a display, each for its dwell time in seconds.
+
+    Whilst an item is shown, the next items are loaded, scaled and encoded on a pool
+    of worker threads, so that each one is ready to send as soon as the dwell ends.
+    At most lookahead items are prepared in advance, and only their encoded pixel
+    data is kept, which bounds the memory used.
+
+    Each source is only prepared on one worker at a time, as file objects and
+    windows can't be read or drawn from several threads at once.
+    """
+
+    def __init__(
+        self,
+        display: Display,
+        items: Sequence[PlaylistItem],
+        *,
+        lookahead: int = 2,
+        max_workers: int = 2,
+        loop: bool = False,
+    ) -> None:
+        self._display = display
+        self._items = list(items)
+        self._lookahead = lookahead
+        self._max_workers = max_workers
+        self._loop = loop
+        self._stop = threading.Event()
+        self._blank: Dict[str, Framebuffer] = {}
+        # A lock for each source, by id, held whilst the source is prepared.
+        self._source_locks: Dict[int, threading.Lock] = {}
+
+    def play(self) -> None:
+        """
+        Show the items in the playlist.
+
+        This function is blocking, and returns once every item has been shown, or
+        when stop is called.
+        """
+        self._stop.clear()
+        items: Iterator[PlaylistItem] = (
+            cycle(self._items) if self._loop else iter(self._items)
+        )
+        pending: Deque[Tuple[PlaylistItem, "Future[Dict[str, Framebuffer]]"]] = deque()
+
+        executor = ThreadPoolExecutor(
+            max_workers=self._max_workers,
+            thread_name_prefix="einkd-playlist",
+        )
+        try:
+            self._fill(executor, items, pending)
+            while pending and not self._stop.is_set():
+                item, future = pending.popleft()
+                self._fill(executor, items, pending)
+
+                frame = future.result()
+                LOGGER.debug(f"Showing playlist item: {item.source}")
+                for channel, data in frame.items():
+                    self._display.show_encoded(data, channel=channel)
+                self._display.refresh()
+
+                self._stop.wait(item.dwell)
+        finally:
+            for _, future in pending:
+                future.cancel()
+            executor.shutdown()
+
+    def stop(self) -> None:
+        """Stop playing, once the current item has been shown."""
+        self._stop.set()
+
+    def _fill(
+        self,
+        executor: ThreadPoolExecutor,
+        items: Iterator[PlaylistItem],
+        pending: Deque[Tuple[PlaylistItem, "Future[Dict[str, Framebuffer]]"]],
+    ) -> None:
+        """
+        Start preparing items, until lookahead items are pending.
+
+        :param executor: The executor to prepare the items on.
+        :param items: The items that are still to be prepared.
+        :param pending: The items that are being prepared, in order.
+        """
+        while len(pending) < self._lookahead + 1:
+            item = next(items, None)
+            if item is None:
+                return
+            lock = self._source_locks.setdefault(id(item.source), threading.Lock())
+            pending.append((item, executor.submit(self._prepare, item, lock)))
+
+    def _prepare(
+        self,
+        item: PlaylistItem,
+        lock: threading.Lock,
+    ) -> Dict[str, Framebuffer]:
+        """
+        Load, scale and encode an item. Runs on a worker thread.
+
+        :param item: The item to prepare.
+        :param lock: The lock for the source of the item.
+        :returns: The encoded pixel data for each channel.
+        """
+        channel = item.channel or self._display.channels[0]
+        if channel not in self._display.channels:
+            raise ValueError(
+                f"Unknown channel: {channel}, expected one of {self._display.channels}.",
+            )
+
+        with lock:
+            if isinstance(item.source, Window):
+                image = item.source.draw()
+            else:
+                window = Window(
+                    self._display.width,
+                    self._display.height,
+                    grid_width=1,
+                    grid_height=1,
+                    components={
+                        (0, 0): ImageComponent("playlist", 1, 1, image=item.source),
+                    },
+                )
+                image = window.draw()
+
+        frame = self._blank_frame()
+        frame[channel] = self._display.encode(image, channel=channel)
+        return frame
+
+    def _blank_frame(self) -> Dict[str, Framebuffer]:
+        """
+        Get the encoded pixel data to clear every channel.
+
+        :returns: The encoded pixel data for each channel.
+        """
+        if not self._blank:
+            blank = Image.new("1", self._display.resolution, 255)
+            self._blank = {
+                channel: self._display.encode(blank, channel=channel)
+                for channel in self._display.channels
+            }
+        return dict(self._blank)
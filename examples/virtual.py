@@ -1,9 +1,6 @@
 """Example code for the epd2in13bc driver."""
-from time import sleep
-
-from PIL import Image
-
 from einkd.drivers.virtual import TkinterDriver
+from einkd.playlist import Playlist, PlaylistItem
 
 images = [
     'examples/img/880x528-b.png',
@@ -16,10 +13,8 @@ if __name__ == "__main__":
     with TkinterDriver((800, 528)) as epd:
         epd.clear()
 
-        sleep(5)
-
-        for img_name in images:
-            img = Image.open(img_name)
-            epd.show(img)
-            epd.refresh()
-            sleep(5)
+        playlist = Playlist(
+            epd,
+            [PlaylistItem(img_name, dwell=5) for img_name in images],
+        )
+        playlist.play()
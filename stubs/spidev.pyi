@@ -1,5 +1,5 @@
 """Partial stubs for spidev."""
-from typing import List
+from typing import List, Union
 
 class SpiDev:
 
@@ -9,3 +9,4 @@ class SpiDev:
     def close(self) -> None: ...
     def open(self, bus: int, device: int) -> None: ...
     def writebytes(self, data: List[int]) -> None: ...
+    def writebytes2(self, data: Union[bytes, bytearray, memoryview, List[int]]) -> None: ...
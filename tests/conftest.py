@@ -0,0 +1,5 @@
+"""Test configuration."""
+from einkd.emulator import install
+
+# The emulated GPIO and SPI modules must be installed before any driver is imported.
+install()
@@ -0,0 +1,93 @@
+"""Tests for the emulated IL0373 controller."""
+import pytest
+
+from einkd.emulator import IL0373, ProtocolError, install
+from einkd.emulator.il0373 import (
+    CMD_LUT_BB,
+    CMD_LUT_BW,
+    CMD_LUT_VCOM,
+    CMD_LUT_WB,
+    CMD_LUT_WW,
+)
+
+
+def _panel(*, strict: bool = True) -> IL0373:
+    """Create a controller connected to a new emulator, which is never busy."""
+    emulator = install()
+    return emulator.add_panel(IL0373(
+        refresh_time=0,
+        fast_refresh_time=0,
+        power_on_time=0,
+        power_off_time=0,
+        strict=strict,
+    ))
+
+
+def _send(panel: IL0373, command: int, data: bytes = b"") -> None:
+    """Send a command and its data, as the driver would."""
+    panel.set_pin(panel.cs_pin, 0)
+    panel.set_pin(panel.dc_pin, 0)
+    panel.write(bytes([command]))
+    if data:
+        panel.set_pin(panel.dc_pin, 1)
+        panel.write(data)
+    panel.set_pin(panel.cs_pin, 1)
+
+
+def test_unselected_data() -> None:
+    """Data sent whilst the controller is not selected is an error."""
+    panel = _panel()
+    with pytest.raises(ProtocolError):
+        panel.write(b"\x12")
+
+
+def test_errors_recorded() -> None:
+    """Errors are recorded rather than raised, if not strict."""
+    panel = _panel(strict=False)
+    _send(panel, 0x12)
+
+    assert panel.errors == ["The display was refreshed whilst powered off."]
+    assert not panel.refreshes
+
+
+def test_missing_arguments() -> None:
+    """A command that is sent too little data is an error."""
+    panel = _panel()
+    _send(panel, 0x06, b"\x17")
+    with pytest.raises(ProtocolError):
+        _send(panel, 0x04)
+
+
+def test_missing_luts() -> None:
+    """Refreshing with register LUTs that were never uploaded is an error."""
+    panel = _panel()
+    _send(panel, 0x04)
+    _send(panel, 0x00, b"\xbf")
+    with pytest.raises(ProtocolError):
+        _send(panel, 0x12)
+
+
+def test_undriven_pixels_unchanged() -> None:
+    """Pixels whose LUT has no driving phases keep their colour."""
+    panel = _panel()
+    _send(panel, 0x04)
+    _send(panel, 0x00, b"\xbf")
+    _send(panel, CMD_LUT_VCOM, bytes(44))
+    _send(panel, CMD_LUT_WW, bytes(42))
+    _send(panel, CMD_LUT_BB, bytes(42))
+    _send(panel, CMD_LUT_BW, bytes([0x80, 0x19, 0x01, 0, 0, 0x01]) + bytes(36))
+    _send(panel, CMD_LUT_WB, bytes([0x40, 0x19, 0x01, 0, 0, 0x01]) + bytes(36))
+
+    # The old and new images are both black, so every pixel uses BB.
+    black = bytes(panel.width // 8 * panel.height)
+    _send(panel, 0x10, black)
+    _send(panel, 0x13, black)
+    _send(panel, 0x12)
+
+    assert panel.images["black"].getextrema() == (255, 255)
+
+    # Every pixel changes from white to black, so uses WB.
+    _send(panel, 0x10, b"\xff" * len(black))
+    _send(panel, 0x12)
+
+    assert panel.images["black"].getextrema() == (0, 0)
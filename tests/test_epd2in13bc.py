@@ -0,0 +1,180 @@
+"""Tests for the 2.13" (B) driver, against an emulated controller."""
+from typing import Iterator, Tuple
+
+import pytest
+from PIL import Image, ImageDraw
+
+from einkd.drivers.epd2in13bc import EPD2in13bcDisplay, EPD2in13bcDriver
+from einkd.emulator import IL0373, install
+from einkd.gui import Window
+from einkd.gui.components import FilledComponent
+
+Fixture = Tuple[EPD2in13bcDisplay, IL0373]
+
+
+def _connect(profile: str) -> Iterator[Fixture]:
+    """Connect a driver to a new emulated controller."""
+    emulator = install()
+    panel = emulator.add_panel(IL0373(
+        refresh_time=0.01,
+        fast_refresh_time=0.01,
+        power_on_time=0,
+        power_off_time=0,
+    ))
+    driver = EPD2in13bcDriver(spi_max_speed=100_000_000, profile=profile)
+    driver.setup()
+    assert isinstance(driver._display, EPD2in13bcDisplay)
+    yield driver._display, panel
+    driver.cleanup()
+
+
+@pytest.fixture
+def epd() -> Iterator[Fixture]:
+    """A display using the quality profile, and the emulated controller."""
+    yield from _connect("quality")
+
+
+@pytest.fixture
+def fast_epd() -> Iterator[Fixture]:
+    """A display using the fast profile, and the emulated controller."""
+    yield from _connect("fast")
+
+
+def _image(*boxes: Tuple[int, int, int, int]) -> Image.Image:
+    """Create an image with some black rectangles."""
+    image = Image.new("1", (212, 104), 255)
+    draw = ImageDraw.Draw(image)
+    for box in boxes:
+        draw.rectangle(box, fill=0)
+    return image
+
+
+def _shown(panel: IL0373, colour: str) -> bytes:
+    """Get the image on the panel, in the same form as _image."""
+    return panel.images[colour].tobytes()
+
+
+def test_full_refresh(epd: Fixture) -> None:
+    """Both channels are shown by a full refresh."""
+    display, panel = epd
+    black, red = _image((10, 10, 60, 40)), _image((100, 20, 150, 80))
+    display.show(black, channel="black")
+    display.show(red, channel="red")
+    display.refresh()
+
+    assert _shown(panel, "black") == black.tobytes()
+    assert _shown(panel, "red") == red.tobytes()
+    assert not panel.refreshes[-1].partial
+    assert panel.refreshes[-1].colours == "bwr"
+
+
+def test_partial_refresh(epd: Fixture) -> None:
+    """A small change is sent and refreshed in a partial window."""
+    display, panel = epd
+    display.show(_image((10, 10, 60, 40)))
+    display.refresh()
+
+    image = _image((10, 10, 60, 40), (100, 50, 120, 60))
+    display.show(image)
+    display.refresh()
+
+    assert _shown(panel, "black") == image.tobytes()
+    assert panel.refreshes[-1].partial
+    assert panel.refreshes[-1].window == (40, 100, 56, 121)
+
+
+def test_unchanged_refresh_skipped(epd: Fixture) -> None:
+    """Refreshing without any changes does not refresh the panel."""
+    display, panel = epd
+    display.show(_image((10, 10, 60, 40)))
+    display.refresh()
+    display.refresh()
+
+    assert len(panel.refreshes) == 1
+
+
+def test_fast_refresh(fast_epd: Fixture) -> None:
+    """The fast profile drives the panel once its contents are known."""
+    display, panel = fast_epd
+    first = _image((10, 10, 60, 40))
+    display.show(first)
+    display.refresh()
+
+    assert display.last_profile == "quality"
+    assert _shown(panel, "black") == first.tobytes()
+
+    second = _image((10, 10, 60, 40), (150, 70, 160, 80))
+    display.show(second)
+    display.refresh()
+
+    assert display.last_profile == "fast"
+    assert panel.refreshes[-1].register_lut
+    assert _shown(panel, "black") == second.tobytes()
+
+    display.show(first)
+    display.refresh()
+
+    assert _shown(panel, "black") == first.tobytes()
+
+
+def test_banded_refresh(epd: Fixture) -> None:
+    """An image sent in bands is shown with a full refresh."""
+    display, panel = epd
+    window = Window(
+        212,
+        104,
+        components={
+            (0, 0): FilledComponent("left", 3, 12, colour="black"),
+            (7, 6): FilledComponent("right", 5, 6, colour="black"),
+        },
+    )
+    display.show_bands(window.draw_bands(16, scan_order=display.scan_order))
+    display.refresh()
+
+    assert _shown(panel, "black") == window.draw().convert("1").tobytes()
+    assert not panel.refreshes[-1].partial
+
+
+def test_packed_refresh(epd: Fixture) -> None:
+    """Packed data in the native layout is shown without conversion."""
+    display, panel = epd
+    image = _image((10, 10, 60, 40))
+    packed = bytearray(image.transpose(Image.Transpose.ROTATE_270).tobytes())
+    display.show_buffer(packed, packed=True)
+    display.refresh()
+
+    assert _shown(panel, "black") == image.tobytes()
+
+
+def test_unpacked_refresh(epd: Fixture) -> None:
+    """Unpacked data with a byte per pixel is shown."""
+    display, panel = epd
+    image = _image((10, 10, 60, 40))
+    display.show_buffer(memoryview(image.convert("L").tobytes()))
+    display.refresh()
+
+    assert _shown(panel, "black") == image.tobytes()
+
+
+def test_failed_bands_resent(epd: Fixture) -> None:
+    """A channel is sent again after streaming its bands fails part way through."""
+    display, panel = epd
+    display.full_refresh_interval = 1
+    display.show(_image((10, 10, 60, 40)))
+    display.refresh()
+
+    def failing_bands() -> Iterator[Image.Image]:
+        yield Image.new("1", (16, 104), 0)
+        raise ValueError("Rendering failed")
+
+    with pytest.raises(ValueError):
+        display.show_bands(failing_bands(), channel="red")
+
+    for offset in range(3):
+        image = _image((10, 10, 60, 40), (100 + 10 * offset, 50, 105 + 10 * offset, 60))
+        display.show(image)
+        display.refresh()
+
+    assert not panel.refreshes[-3].partial
+    assert _shown(panel, "black") == image.tobytes()
+    assert _shown(panel, "red") == _image().tobytes()
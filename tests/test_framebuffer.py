@@ -0,0 +1,69 @@
+"""Tests for the framebuffer."""
+from typing import Tuple
+
+import pytest
+from PIL import Image, ImageDraw
+
+from einkd.framebuffer import Framebuffer
+
+
+def _framebuffer(*points: Tuple[int, int]) -> Framebuffer:
+    """Create a 20x6 framebuffer with some inked pixels."""
+    image = Image.new("1", (20, 6), 255)
+    for point in points:
+        ImageDraw.Draw(image).point(point, fill=0)
+    return Framebuffer.from_image(image)
+
+
+def test_layout() -> None:
+    """Rows are padded to whole bytes, and the image round trips."""
+    framebuffer = _framebuffer((0, 0), (19, 5))
+
+    assert framebuffer.stride == 3
+    assert len(framebuffer) == 18
+    # PIL pads the end of each row with zero bits.
+    assert framebuffer.row(0).tobytes() == b"\x7f\xff\xf0"
+    assert framebuffer.to_image().tobytes() == framebuffer.data.tobytes()
+
+
+def test_bbox_empty() -> None:
+    """A framebuffer with no set bits has no bounding box."""
+    assert (_framebuffer() ^ _framebuffer()).bbox() is None
+
+
+def test_bbox_byte_aligned() -> None:
+    """The bounding box is rounded out to whole bytes, within the width."""
+    changed = _framebuffer((9, 2), (18, 3)).changed(_framebuffer())
+
+    assert changed == (8, 2, 20, 4)
+
+
+def test_bbox_single_byte() -> None:
+    """A change within a byte covers just that byte."""
+    assert _framebuffer((3, 5)).changed(_framebuffer()) == (0, 5, 8, 6)
+
+
+def test_region() -> None:
+    """A region is returned row by row, rounded out to whole bytes."""
+    framebuffer = _framebuffer((9, 2), (10, 3))
+
+    assert framebuffer.region((9, 2, 11, 4)) == b"\xbf\xdf"
+    assert framebuffer.region((0, 0, 20, 6)) == framebuffer.data.tobytes()
+
+
+def test_copy_independent() -> None:
+    """A copy does not share data with its source."""
+    framebuffer = Framebuffer(20, 6)
+    copy = framebuffer.copy()
+    framebuffer.data[0] = 0
+
+    assert copy != framebuffer
+    assert copy == Framebuffer(20, 6)
+
+
+def test_size_mismatch() -> None:
+    """Framebuffers of different sizes can't be compared."""
+    with pytest.raises(ValueError):
+        _framebuffer() ^ Framebuffer(8, 6)
+    with pytest.raises(ValueError):
+        Framebuffer(20, 6, bytes(10))
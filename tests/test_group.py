@@ -0,0 +1,143 @@
+"""Tests for the display group."""
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import pytest
+from PIL import Image, ImageDraw
+
+from einkd.display import Display
+from einkd.drivers.epd2in13bc import EPD2in13bcDriver
+from einkd.drivers.group import DisplayGroup, GroupDriver
+from einkd.emulator import Emulator, IL0373, install
+from einkd.framebuffer import Framebuffer
+from einkd.pipeline import PipelinedDisplay
+
+# The reset, DC, CS and BUSY pins of the panel on each SPI device.
+PANEL_PINS = [
+    (17, 25, 8, 24),
+    (5, 6, 7, 13),
+]
+
+
+class RecordingDisplay(Display):
+    """A display that records the threads that encode for it."""
+
+    channels = ["black"]
+
+    def __init__(self, resolution: Tuple[int, int]) -> None:
+        self._resolution = resolution
+        self.encoded_on: List[str] = []
+        self.shown: Optional[Framebuffer] = None
+
+    @property
+    def resolution(self) -> Tuple[int, int]:
+        """The resolution of the display."""
+        return self._resolution
+
+    def encode(
+        self,
+        buffer: Image.Image,
+        *,
+        channel: Optional[str] = None,
+    ) -> Framebuffer:
+        """Encode an image, recording the thread."""
+        self.encoded_on.append(threading.current_thread().name)
+        return super().encode(buffer, channel=channel)
+
+    def show(self, buffer: Image.Image, *, channel: Optional[str] = None) -> None:
+        """Set the image, which should already have been encoded."""
+        raise AssertionError("Images should be shown encoded.")
+
+    def show_encoded(
+        self,
+        data: Framebuffer,
+        *,
+        channel: Optional[str] = None,
+    ) -> None:
+        """Set the image from encoded pixel data."""
+        self.shown = data
+
+    def refresh(self) -> None:
+        """Refresh the display."""
+
+
+def _emulator(panels: int) -> Emulator:
+    """Create an emulator with some slow panels, each on its own pins and device."""
+    emulator = install()
+    for spi_dev, (reset_pin, dc_pin, cs_pin, busy_pin) in enumerate(
+        PANEL_PINS[:panels],
+    ):
+        panel = IL0373(
+            reset_pin=reset_pin,
+            dc_pin=dc_pin,
+            cs_pin=cs_pin,
+            busy_pin=busy_pin,
+            refresh_time=0.3,
+            power_on_time=0,
+        )
+        emulator.add_panel(panel, spi_dev=spi_dev)
+    return emulator
+
+
+def _driver(spi_dev: int) -> EPD2in13bcDriver:
+    """Create a driver for the panel on an SPI device."""
+    reset_pin, dc_pin, cs_pin, busy_pin = PANEL_PINS[spi_dev]
+    return EPD2in13bcDriver(
+        reset_pin=reset_pin,
+        dc_pin=dc_pin,
+        cs_pin=cs_pin,
+        busy_pin=busy_pin,
+        spi_dev=spi_dev,
+        spi_max_speed=100_000_000,
+    )
+
+
+def test_parallel_refresh() -> None:
+    """Every display in the group is refreshed at the same time."""
+    emulator = _emulator(2)
+    driver = GroupDriver([_driver(0), _driver(1)])
+    with driver as display:
+        image = Image.new("1", display.resolution, 255)
+        ImageDraw.Draw(image).rectangle((10, 10, 60, 40), fill=0)
+        display.show(image)
+
+        start = time.monotonic()
+        display.refresh()
+        duration = time.monotonic() - start
+
+    assert duration < 0.5
+    for panel in emulator.panels.values():
+        assert panel.images["black"].tobytes() == image.tobytes()
+    started = [panel.refreshes[-1].started for panel in emulator.panels.values()]
+    assert max(started) - min(started) < 0.1
+
+
+def test_setup_failure_cleans_up() -> None:
+    """Drivers that were set up are cleaned up if a later driver fails."""
+    emulator = _emulator(1)
+    driver = GroupDriver([_driver(0), _driver(1)])
+    with pytest.raises(FileNotFoundError):
+        driver.setup()
+
+    for pin in PANEL_PINS[0]:
+        assert pin not in emulator.pin_modes
+
+
+def test_pipelined_group() -> None:
+    """A pipelined group encodes for each type of display on the render worker."""
+    displays = [RecordingDisplay((16, 8)), RecordingDisplay((8, 8))]
+    pipeline = PipelinedDisplay(DisplayGroup(displays))
+    image = Image.new("1", (16, 8), 255)
+    ImageDraw.Draw(image).rectangle((0, 0, 3, 7), fill=0)
+    pipeline.show(image)
+    pipeline.refresh()
+    pipeline.close()
+
+    shown: Dict[Tuple[int, int], bytes] = {}
+    for display in displays:
+        assert display.encoded_on == ["einkd-render"]
+        assert display.shown is not None
+        shown[display.resolution] = display.shown.data.tobytes()
+    assert shown[(16, 8)] == image.tobytes()
+    assert shown[(8, 8)] != b"\xff" * 8
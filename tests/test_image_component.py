@@ -0,0 +1,78 @@
+"""Tests for the image component."""
+import os
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import pytest
+from PIL import Image, ImageDraw, JpegImagePlugin
+
+from einkd.gui.components import ImageComponent
+
+
+def test_image_edited_in_place() -> None:
+    """Changes to an image source are shown when it is next drawn."""
+    source = Image.new("RGB", (100, 50), "white")
+    component = ImageComponent("image", 1, 1, image=source)
+    assert component.draw(100, 50).getextrema() == ((255, 255),) * 3
+
+    ImageDraw.Draw(source).rectangle((0, 0, 99, 49), fill="black")
+
+    assert component.draw(100, 50).getextrema() == ((0, 0),) * 3
+
+
+def test_path_rewritten(tmp_path: Path) -> None:
+    """A path source is reloaded when the file changes."""
+    path = tmp_path / "latest.png"
+    Image.new("RGB", (100, 50), "white").save(path)
+    component = ImageComponent("image", 1, 1, image=path)
+    assert component.draw(100, 50).getextrema() == ((255, 255),) * 3
+
+    Image.new("RGB", (100, 50), "black").save(path)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert component.draw(100, 50).getextrema() == ((0, 0),) * 3
+
+
+def test_path_cached(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """An unchanged path source is only loaded once."""
+    path = tmp_path / "image.png"
+    Image.new("RGB", (100, 50), "white").save(path)
+
+    opened: List[object] = []
+    original_open = Image.open
+
+    def record_open(fp: Path) -> Image.Image:
+        opened.append(fp)
+        return original_open(fp)
+
+    monkeypatch.setattr(Image, "open", record_open)
+    component = ImageComponent("image", 1, 1, image=path)
+    component.draw(100, 50)
+    component.draw(100, 50)
+
+    assert opened == [path]
+
+
+def test_reduced_size_decode(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """A large JPEG is decoded at a reduced scale, no smaller than the component."""
+    path = tmp_path / "large.jpg"
+    Image.new("RGB", (2000, 1600), "white").save(path)
+
+    decoded: List[Tuple[int, int]] = []
+    original_draft = JpegImagePlugin.JpegImageFile.draft
+
+    def record_draft(
+        self: JpegImagePlugin.JpegImageFile,
+        mode: Optional[str],
+        size: Optional[Tuple[int, int]],
+    ) -> object:
+        result = original_draft(self, mode, size)
+        decoded.append(self.size)
+        return result
+
+    monkeypatch.setattr(JpegImagePlugin.JpegImageFile, "draft", record_draft)
+    image = ImageComponent("image", 1, 1, image=path).draw(212, 104)
+
+    assert decoded and set(decoded) == {(250, 200)}
+    assert image.size == (212, 104)
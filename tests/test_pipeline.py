@@ -0,0 +1,125 @@
+"""Tests for the pipelined display."""
+import threading
+from typing import Dict, List, Optional
+
+import pytest
+from PIL import Image, ImageDraw
+
+from einkd.display import Display
+from einkd.drivers.epd2in13bc import EPD2in13bcDisplay, EPD2in13bcDriver
+from einkd.emulator import IL0373, install
+from einkd.framebuffer import Framebuffer
+from einkd.pipeline import PipelinedDisplay, RenderFunction
+
+
+class RecordingDisplay(Display):
+    """A display that records each frame that is refreshed, and where it ran."""
+
+    resolution = (16, 8)
+    channels = ["black"]
+
+    def __init__(self) -> None:
+        self.frames: List[bytes] = []
+        self.threads: Dict[str, str] = {}
+        self._shown: Optional[bytes] = None
+
+    def encode(
+        self,
+        buffer: Image.Image,
+        *,
+        channel: Optional[str] = None,
+    ) -> Framebuffer:
+        """Encode an image, recording the thread."""
+        self.threads["encode"] = threading.current_thread().name
+        return super().encode(buffer, channel=channel)
+
+    def show(self, buffer: Image.Image, *, channel: Optional[str] = None) -> None:
+        """Set the image."""
+        self._shown = buffer.convert("1").tobytes()
+
+    def refresh(self) -> None:
+        """Record the shown image, and the thread."""
+        self.threads["refresh"] = threading.current_thread().name
+        assert self._shown is not None
+        self.frames.append(self._shown)
+
+
+def _frame(index: int) -> Image.Image:
+    """Create a distinct image for each index."""
+    image = Image.new("1", (16, 8), 255)
+    ImageDraw.Draw(image).point((index, 0), fill=0)
+    return image
+
+
+def _render(image: Image.Image) -> RenderFunction:
+    """Create a render function that returns an image."""
+    return lambda: {"black": image}
+
+
+def _fail() -> Dict[str, Image.Image]:
+    """Fail to render a frame."""
+    raise ValueError("Render failed")
+
+
+def test_frames_in_order() -> None:
+    """Frames are shown in the order they are queued, on the worker threads."""
+    display = RecordingDisplay()
+    pipeline = PipelinedDisplay(display, depth=2)
+    for index in range(6):
+        pipeline.show(_frame(index))
+        pipeline.refresh()
+    pipeline.close()
+
+    assert display.frames == [_frame(index).tobytes() for index in range(6)]
+    assert display.threads == {"encode": "einkd-render", "refresh": "einkd-commit"}
+
+
+def test_error_raised() -> None:
+    """An error on a worker is raised by the next call, and later frames are shown."""
+    display = RecordingDisplay()
+    pipeline = PipelinedDisplay(display)
+    pipeline.submit(_fail)
+    with pytest.raises(RuntimeError) as error:
+        pipeline.wait()
+    assert isinstance(error.value.__cause__, ValueError)
+
+    pipeline.show(_frame(1))
+    pipeline.refresh()
+    pipeline.close()
+
+    assert display.frames == [_frame(1).tobytes()]
+
+
+def test_close_after_error() -> None:
+    """Closing raises any error, then the pipeline stays closed."""
+    pipeline = PipelinedDisplay(RecordingDisplay())
+    pipeline.submit(_fail)
+    with pytest.raises(RuntimeError):
+        pipeline.close()
+
+    pipeline.close()
+    with pytest.raises(RuntimeError, match="closed"):
+        pipeline.submit(_render(_frame(0)))
+    pipeline.wait()
+
+
+def test_pipelined_epd() -> None:
+    """Frames are shown on an emulated controller in order."""
+    emulator = install()
+    panel = emulator.add_panel(IL0373(refresh_time=0.05, power_on_time=0))
+    driver = EPD2in13bcDriver(spi_max_speed=100_000_000, full_refresh_interval=0)
+    driver.setup()
+    assert isinstance(driver._display, EPD2in13bcDisplay)
+
+    pipeline = PipelinedDisplay(driver._display)
+    images = []
+    for index in range(3):
+        image = Image.new("1", (212, 104), 255)
+        ImageDraw.Draw(image).rectangle((10 * index, 10, 10 * index + 50, 60), fill=0)
+        images.append(image)
+        pipeline.submit(_render(image))
+    pipeline.close()
+    driver.cleanup()
+
+    assert len(panel.refreshes) == 3
+    assert panel.images["black"].tobytes() == images[-1].tobytes()
@@ -0,0 +1,63 @@
+"""Tests for the playlist."""
+import random
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from PIL import Image
+
+from einkd.display import Display
+from einkd.framebuffer import Framebuffer
+from einkd.playlist import Playlist, PlaylistItem
+
+
+class RecordingDisplay(Display):
+    """A display that records each frame that is refreshed."""
+
+    resolution = (212, 104)
+    channels = ["black", "red"]
+
+    def __init__(self, frames: int) -> None:
+        self.frames: List[bytes] = []
+        self.playlist: Optional[Playlist] = None
+        self._frames = frames
+        self._shown: Optional[Framebuffer] = None
+
+    def show(self, buffer: Image.Image, *, channel: Optional[str] = None) -> None:
+        """Set the image."""
+        if channel == "black":
+            self._shown = Framebuffer.from_image(buffer)
+
+    def refresh(self) -> None:
+        """Record the shown image, and stop once enough frames have been shown."""
+        assert self._shown is not None
+        self.frames.append(self._shown.data.tobytes())
+        if len(self.frames) >= self._frames and self.playlist is not None:
+            self.playlist.stop()
+
+
+def _write_noise(path: Path, size: Tuple[int, int]) -> None:
+    """Write a JPEG of random noise, which is slow to decode."""
+    rand = random.Random(0)
+    data = bytes(rand.getrandbits(8) for _ in range(size[0] * size[1]))
+    Image.frombytes("L", size, data).save(path, "JPEG", quality=95)
+
+
+def test_loop_single_file_object(tmp_path: Path) -> None:
+    """A single file object can be looped, whilst the next loops are prepared."""
+    path = tmp_path / "noise.jpg"
+    _write_noise(path, (1200, 600))
+
+    display = RecordingDisplay(frames=6)
+    with path.open("rb") as source:
+        playlist = Playlist(
+            display,
+            [PlaylistItem(source, dwell=0)],
+            lookahead=3,
+            max_workers=3,
+            loop=True,
+        )
+        display.playlist = playlist
+        playlist.play()
+
+    assert len(display.frames) == 6
+    assert len(set(display.frames)) == 1